@@ -0,0 +1,227 @@
+"""
+Benchmark the runnable Executor on a synthetic workspace.
+
+It generates input files of mixed sizes and runnables using overlapping subsets of them.
+It measures the storage of the run info, the cold and warm up-to-date checks,
+the first build and the no-op rebuild through execute() and execute_all() and writes the results as JSON.
+
+Usage:
+
+    python benchmarks/benchmark_executor.py --files 10000 --runnables 2000 --output results.json
+    python benchmarks/benchmark_executor.py --files 10000 --runnables 2000 --baseline results.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import shutil
+import subprocess  # nosec
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from py_app_dev.core.logging import logger
+from py_app_dev.core.run_info import JsonFilesRunInfoBackend, JsonIndexRunInfoBackend, RunInfoBackend, SqliteRunInfoBackend
+from py_app_dev.core.runnable import Executor, RunInfoStatus, Runnable
+
+#: File size ranges in bytes and their probability
+FILE_SIZE_DISTRIBUTION = [((64, 4 * 1024), 0.9), ((4 * 1024, 64 * 1024), 0.098), ((64 * 1024, 1024 * 1024), 0.002)]
+RUN_INFO_BACKENDS: dict[str, Callable[[Path], RunInfoBackend]] = {
+    "json_files": JsonFilesRunInfoBackend,
+    "json_index": lambda cache_dir: JsonIndexRunInfoBackend(cache_dir / JsonIndexRunInfoBackend.DEFAULT_INDEX_FILE),
+    "sqlite": lambda cache_dir: SqliteRunInfoBackend(cache_dir / SqliteRunInfoBackend.DEFAULT_DATABASE_FILE),
+}
+
+
+@dataclass
+class BenchmarkParameters:
+    files: int
+    runnables: int
+    inputs_per_runnable: int
+    seed: int
+    backend: str
+
+
+@dataclass
+class ScenarioResult:
+    wall_time_s: float
+    per_runnable_us: float
+    peak_memory_bytes: int | None = None
+
+
+class SyntheticRunnable(Runnable):
+    def __init__(self, name: str, inputs: list[Path], output: Path) -> None:
+        super().__init__()
+        self._name = name
+        self._inputs = inputs
+        self._output = output
+
+    def get_name(self) -> str:
+        return self._name
+
+    def run(self) -> int:
+        return 0
+
+    def get_inputs(self) -> list[Path]:
+        return self._inputs
+
+    def get_outputs(self) -> list[Path]:
+        return [self._output]
+
+
+def _get_file_size(rng: random.Random) -> int:
+    (minimum, maximum) = rng.choices([size_range for size_range, _ in FILE_SIZE_DISTRIBUTION], weights=[weight for _, weight in FILE_SIZE_DISTRIBUTION])[0]
+    return rng.randint(minimum, maximum)
+
+
+def generate_workspace(workspace: Path, parameters: BenchmarkParameters) -> list[Runnable]:
+    """Generate the input files (100 per directory) and one output file per runnable."""
+    rng = random.Random(parameters.seed)  # noqa: S311
+    input_files = []
+    for index in range(parameters.files):
+        input_file = workspace / "src" / f"dir{index // 100:04d}" / f"file{index:06d}.c"
+        input_file.parent.mkdir(parents=True, exist_ok=True)
+        input_file.write_bytes(rng.randbytes(_get_file_size(rng)))
+        input_files.append(input_file)
+    runnables: list[Runnable] = []
+    for index in range(parameters.runnables):
+        output_file = workspace / "build" / f"runnable{index:06d}.o"
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        output_file.write_text(str(index))
+        inputs = rng.sample(input_files, min(parameters.inputs_per_runnable, len(input_files)))
+        runnables.append(SyntheticRunnable(f"runnable{index:06d}", inputs, output_file))
+    return runnables
+
+
+def _measure(scenario: Callable[[], object], runnables_count: int, measure_memory: bool) -> ScenarioResult:
+    start_time = time.perf_counter()
+    scenario()
+    wall_time_s = time.perf_counter() - start_time
+    peak_memory_bytes = None
+    if measure_memory:
+        # Memory is measured in a separate run, because tracing the allocations slows down the execution
+        tracemalloc.start()
+        scenario()
+        peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return ScenarioResult(wall_time_s, wall_time_s / runnables_count * 1e6, peak_memory_bytes)
+
+
+def run_benchmarks(workspace: Path, parameters: BenchmarkParameters, measure_memory: bool = True) -> dict[str, ScenarioResult]:
+    runnables = generate_workspace(workspace, parameters)
+    cache_dir = workspace / "cache"
+
+    def create_executor() -> Executor:
+        return Executor(cache_dir=cache_dir, run_info_backend=RUN_INFO_BACKENDS[parameters.backend](cache_dir))
+
+    def store_run_info() -> None:
+        with create_executor() as executor:
+            for runnable in runnables:
+                executor.store_run_info(runnable)
+
+    def check_all(executor: Executor) -> None:
+        statuses = [executor.previous_run_info_matches(runnable) for runnable in runnables]
+        if any(status is not RunInfoStatus.MATCH for status in statuses):
+            raise RuntimeError("The workspace changed, all runnables shall be up-to-date.")
+
+    def execute_each(executor_cache_dir: Path) -> None:
+        with Executor(cache_dir=executor_cache_dir, run_info_backend=RUN_INFO_BACKENDS[parameters.backend](executor_cache_dir)) as executor:
+            for runnable in runnables:
+                executor.execute(runnable)
+
+    def execute_all(executor_cache_dir: Path) -> None:
+        with Executor(cache_dir=executor_cache_dir, run_info_backend=RUN_INFO_BACKENDS[parameters.backend](executor_cache_dir)) as executor:
+            executor.execute_all(runnables)
+
+    def first_build(build: Callable[[Path], None], executor_cache_dir: Path) -> None:
+        shutil.rmtree(executor_cache_dir, ignore_errors=True)
+        build(executor_cache_dir)
+
+    results = {"store_run_info": _measure(store_run_info, len(runnables), measure_memory)}
+    # Builds use their own cache directories, such that the first build starts without any run info
+    for build_name, build in [("execute", execute_each), ("execute_all", execute_all)]:
+        build_cache_dir = workspace / f"cache_{build_name}"
+        results[f"first_build_{build_name}"] = _measure(partial(first_build, build, build_cache_dir), len(runnables), measure_memory)
+        # All runnables are up-to-date, a new executor only has to check them
+        results[f"noop_build_{build_name}"] = _measure(partial(build, build_cache_dir), len(runnables), measure_memory)
+    # A new executor has to read all run info and to stat all files
+    results["cold_check"] = _measure(lambda: check_all(create_executor()), len(runnables), measure_memory)
+    results["cold_check_many"] = _measure(lambda: create_executor().check_many(runnables), len(runnables), measure_memory)
+    # An executor which already checked all runnables knows the file hashes
+    warm_executor = create_executor()
+    check_all(warm_executor)
+    results["warm_check"] = _measure(lambda: check_all(warm_executor), len(runnables), measure_memory)
+    return results
+
+
+def _get_git_commit() -> str | None:
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, cwd=Path(__file__).parent)  # noqa: S607
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any]) -> str:
+    """Get a table with the wall time of every scenario relative to the baseline."""
+    lines = [f"{'Scenario':<24}  {'Baseline [s]':>12}  {'Current [s]':>12}  {'Ratio':>8}"]
+    for scenario, result in results["results"].items():
+        baseline_result = baseline["results"].get(scenario)
+        if baseline_result is None:
+            continue
+        ratio = result["wall_time_s"] / baseline_result["wall_time_s"] if baseline_result["wall_time_s"] else float("inf")
+        lines.append(f"{scenario:<24}  {baseline_result['wall_time_s']:>12.3f}  {result['wall_time_s']:>12.3f}  {ratio:>8.2f}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=10_000, help="number of input files")
+    parser.add_argument("--runnables", type=int, default=2_000, help="number of runnables")
+    parser.add_argument("--inputs-per-runnable", type=int, default=50, help="number of input files of every runnable")
+    parser.add_argument("--seed", type=int, default=42, help="seed for generating the workspace")
+    parser.add_argument("--backend", choices=sorted(RUN_INFO_BACKENDS), default="json_files", help="run info backend")
+    parser.add_argument("--no-memory", action="store_true", help="do not measure the peak memory")
+    parser.add_argument("--workspace", type=Path, help="directory for the generated workspace. Defaults to a temporary directory.")
+    parser.add_argument("--output", type=Path, help="JSON file for the results. Printed to stdout if not given.")
+    parser.add_argument("--baseline", type=Path, help="JSON results of a previous run to compare with")
+    arguments = parser.parse_args(argv)
+
+    parameters = BenchmarkParameters(arguments.files, arguments.runnables, arguments.inputs_per_runnable, arguments.seed, arguments.backend)
+    # Writing a log message per executed runnable would dominate the build scenarios
+    logger.disable("py_app_dev")
+    try:
+        with tempfile.TemporaryDirectory(prefix="executor_benchmark_") as temporary_dir:
+            workspace = arguments.workspace or Path(temporary_dir)
+            scenario_results = run_benchmarks(workspace, parameters, measure_memory=not arguments.no_memory)
+    finally:
+        logger.enable("py_app_dev")
+    results = {
+        "metadata": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _get_git_commit(),
+            "python_version": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": asdict(parameters),
+        },
+        "results": {scenario: asdict(result) for scenario, result in scenario_results.items()},
+    }
+    if arguments.output:
+        arguments.output.write_text(json.dumps(results, indent=2))
+    else:
+        print(json.dumps(results, indent=2))
+    if arguments.baseline:
+        print(compare(results, json.loads(arguments.baseline.read_text())), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
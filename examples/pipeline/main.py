@@ -16,8 +16,8 @@ class ExecutionEnvironment:
 
 
 class PipelineStep(Runnable, ABC):
-    def __init__(self, environment: ExecutionEnvironment, group_name: str | None) -> None:
-        super().__init__()
+    def __init__(self, environment: ExecutionEnvironment, group_name: str | None, timeout_sec: int | None = None) -> None:
+        super().__init__(timeout_sec=timeout_sec)
         self.environment = environment
         self.output_dir = self.environment.output_dir / group_name if group_name else self.environment.output_dir
 
@@ -39,10 +39,12 @@ def main() -> None:
     for step_reference in steps_references:
         execution_environment = ExecutionEnvironment(this_dir, this_dir / "build")
         # Create step instance
-        step = step_reference._class(execution_environment, step_reference.group_name)
+        step = step_reference._class(execution_environment, step_reference.group_name, step_reference.timeout_sec)
         step.output_dir.mkdir(parents=True, exist_ok=True)
         # Execute step - see the files created in the 'build' directory!
-        Executor(step.output_dir).execute(step)
+        # The executor persists the execution information when it is closed.
+        with Executor(step.output_dir) as executor:
+            executor.execute(step)
 
 
 if __name__ == "__main__":
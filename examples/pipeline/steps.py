@@ -6,8 +6,8 @@ from py_app_dev.core.logging import logger
 
 
 class MyBaseStep(PipelineStep):
-    def __init__(self, environment: ExecutionEnvironment, group_name: str) -> None:
-        super().__init__(environment, group_name)
+    def __init__(self, environment: ExecutionEnvironment, group_name: str, timeout_sec: int | None = None) -> None:
+        super().__init__(environment, group_name, timeout_sec)
         self.logger = logger.bind(step_name=self.get_name())
 
 
@@ -0,0 +1,110 @@
+import json
+import os
+from collections import Counter
+from pathlib import Path
+
+from .atomic_file import copy_file_atomically, write_text_atomically
+from .hashing import FileHasher
+from .logging import logger
+
+
+class ArtifactCache:
+    """
+    Content-addressed cache for the output files of runnables.
+
+    The output files are stored once per content hash in the ``objects`` directory.
+    For every cache key a manifest in the ``entries`` directory lists the content hashes of the outputs, in the order they were declared.
+    The cache directory can be shared, e.g. on a network drive, because all files are written atomically.
+
+    Args:
+    ----
+        cache_dir: directory where the artifacts are stored
+        max_size_bytes: maximum size of the stored artifacts. The least recently used entries are removed first.
+        file_hasher: hasher for the output files content
+
+    """
+
+    def __init__(self, cache_dir: Path, max_size_bytes: int | None = None, file_hasher: FileHasher | None = None) -> None:
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self.file_hasher = file_hasher or FileHasher()
+
+    @property
+    def objects_dir(self) -> Path:
+        return self.cache_dir / "objects"
+
+    @property
+    def entries_dir(self) -> Path:
+        return self.cache_dir / "entries"
+
+    def _get_object_file(self, content_hash: str) -> Path:
+        return self.objects_dir / content_hash[:2] / content_hash
+
+    def _get_manifest_file(self, key: str) -> Path:
+        return self.entries_dir / f"{key}.json"
+
+    def _get_object_files(self) -> list[Path]:
+        return [object_file for object_file in self.objects_dir.glob("*/*") if object_file.suffix != ".tmp"]
+
+    @staticmethod
+    def _read_manifest(manifest_file: Path) -> list[str] | None:
+        try:
+            content_hashes: list[str] = json.loads(manifest_file.read_text())["outputs"]
+        except (OSError, ValueError, KeyError):
+            return None
+        return content_hashes
+
+    def restore(self, key: str, outputs: list[Path]) -> bool:
+        """Restore the outputs stored for the key. Returns False if the key is not in the cache."""
+        manifest_file = self._get_manifest_file(key)
+        content_hashes = self._read_manifest(manifest_file)
+        if content_hashes is None:
+            return False
+        object_files = [self._get_object_file(content_hash) for content_hash in content_hashes]
+        if len(object_files) != len(outputs) or not all(object_file.is_file() for object_file in object_files):
+            return False
+        for object_file, output in zip(object_files, outputs, strict=True):
+            copy_file_atomically(object_file, output)
+        # Mark the entry as recently used
+        os.utime(manifest_file)
+        return True
+
+    def store(self, key: str, outputs: list[Path]) -> None:
+        """Store the outputs for the key. Only regular files can be stored, otherwise nothing is stored."""
+        if not outputs or not all(output.is_file() for output in outputs):
+            logger.debug(f"Outputs for artifact '{key}' are not stored. Only regular files can be cached.")
+            return
+        content_hashes = []
+        for output in outputs:
+            content_hash = self.file_hasher.hash_file(output)
+            object_file = self._get_object_file(content_hash)
+            if not object_file.exists():
+                copy_file_atomically(output, object_file)
+            content_hashes.append(content_hash)
+        manifest_file = self._get_manifest_file(key)
+        write_text_atomically(manifest_file, json.dumps({"outputs": content_hashes}))
+        self.evict()
+
+    def get_size(self) -> int:
+        return sum(object_file.stat().st_size for object_file in self._get_object_files())
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the stored artifacts fit into the size budget."""
+        if self.max_size_bytes is None:
+            return
+        object_sizes = {object_file.name: object_file.stat().st_size for object_file in self._get_object_files()}
+        total_size = sum(object_sizes.values())
+        if total_size <= self.max_size_bytes:
+            return
+        manifests = sorted(self.entries_dir.glob("*.json"), key=lambda manifest: manifest.stat().st_mtime_ns)
+        manifest_references = {manifest: set(self._read_manifest(manifest) or []) for manifest in manifests}
+        reference_counts = Counter(content_hash for references in manifest_references.values() for content_hash in references)
+        for manifest in manifests:
+            if total_size <= self.max_size_bytes:
+                break
+            manifest.unlink(missing_ok=True)
+            for content_hash in manifest_references[manifest]:
+                reference_counts[content_hash] -= 1
+                if reference_counts[content_hash] == 0 and content_hash in object_sizes:
+                    self._get_object_file(content_hash).unlink(missing_ok=True)
+                    total_size -= object_sizes[content_hash]
@@ -0,0 +1,171 @@
+import asyncio
+from abc import abstractmethod
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, TypeVar
+
+from .execution_metrics import RunnableMetrics
+from .logging import logger
+from .runnable import ExecutionResult, Executor, ResourcePool, Runnable, RunnableGraph, _RunnableTimeoutError
+
+_T = TypeVar("_T")
+
+
+class AsyncRunnable(Runnable):
+    """
+    Runnable doing its work in a coroutine, e.g. waiting for subprocesses.
+
+    It can also be executed by the synchronous Executor, which runs the coroutine in its own event loop.
+    """
+
+    @abstractmethod
+    async def run_async(self) -> int:
+        """Run and return exit code."""
+
+    def run(self) -> int:
+        return asyncio.run(self.run_async())
+
+
+class AsyncExecutor(Executor):
+    """
+    Executor running many runnables concurrently on one event loop.
+
+    The up-to-date checks and the run info updates, which hash files, are offloaded to a thread pool.
+    AsyncRunnables are awaited on the event loop. Other runnables and runnables with a timeout run in the thread pool.
+
+    Args:
+    ----
+        max_concurrency: maximum number of runnables executed at the same time
+        max_check_workers: number of threads for the up-to-date checks and synchronous runnables
+        **kwargs: see Executor
+
+    """
+
+    DEFAULT_MAX_CONCURRENCY = 32
+
+    def __init__(self, *args: Any, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, max_check_workers: int | None = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.max_concurrency = max_concurrency
+        self._thread_pool = ThreadPoolExecutor(max_workers=max_check_workers, thread_name_prefix="async_executor")
+
+    def close(self) -> None:
+        super().close()
+        self._thread_pool.shutdown()
+
+    async def _offload(self, runnable_metrics: RunnableMetrics, function: Callable[..., _T], *args: Any) -> _T:
+        def attributed_call() -> _T:
+            with self.metrics.attribute(runnable_metrics):
+                return function(*args)
+
+        return await asyncio.get_running_loop().run_in_executor(self._thread_pool, attributed_call)
+
+    async def _run_async(self, runnable: Runnable, runnable_metrics: RunnableMetrics) -> int:
+        if isinstance(runnable, AsyncRunnable) and runnable.timeout_sec is None:
+            return await runnable.run_async()
+        return await self._offload(runnable_metrics, self._run, runnable)
+
+    async def _run_or_restore_async(self, runnable: Runnable, runnable_metrics: RunnableMetrics) -> int:
+        artifact_key, restored = await self._offload(runnable_metrics, self._restore_artifacts, runnable)
+        if restored:
+            return 0
+        exit_code = await self._run_async(runnable, runnable_metrics)
+        await self._offload(runnable_metrics, self._store_artifacts, runnable, artifact_key, exit_code)
+        return exit_code
+
+    async def _timed_run_async(self, run: Callable[[], Any], runnable_metrics: RunnableMetrics) -> int:
+        runnable_metrics.run_start_s = self.metrics.now()
+        try:
+            exit_code: int = await run()
+            return exit_code
+        finally:
+            runnable_metrics.run_time_s = self.metrics.now() - runnable_metrics.run_start_s
+
+    async def execute_async(self, runnable: Runnable) -> int:
+        return (await self.execute_runnable_async(runnable)).exit_code
+
+    async def execute_runnable_async(self, runnable: Runnable) -> ExecutionResult:
+        """Execute the runnable if required and report whether its outputs changed."""
+        self.directory_listing.clear()
+        return await self._measure_and_execute_async(runnable)
+
+    async def _measure_and_execute_async(self, runnable: Runnable) -> ExecutionResult:
+        runnable_metrics = self.metrics.start(runnable.get_id(), runnable.get_name(), lane_id=id(asyncio.current_task()))
+        try:
+            return await self._execute_runnable_async(runnable, runnable_metrics)
+        finally:
+            self.metrics.add(runnable_metrics)
+
+    async def _execute_runnable_async(self, runnable: Runnable, runnable_metrics: RunnableMetrics) -> ExecutionResult:
+        if not runnable.needs_dependency_management:
+            logger.info(f"Runnable '{runnable.get_name()}' does not need dependency management. Executing directly.")
+            if self.dry_run:
+                return ExecutionResult(0)
+            try:
+                exit_code = await self._timed_run_async(partial(self._run_async, runnable, runnable_metrics), runnable_metrics)
+            except _RunnableTimeoutError as error:
+                return self._handle_timeout(runnable, None, error)
+            self.directory_listing.clear()
+            return ExecutionResult(exit_code)
+
+        check = await self._offload(runnable_metrics, self._check_run_info, runnable)
+        runnable_metrics.check_time_s = self.metrics.now() - runnable_metrics.start_s
+        if not check.status.should_run:
+            return await self._offload(runnable_metrics, self._handle_skipped, runnable, check)
+        logger.info(f"Runnable '{runnable.get_name()}' must run. {check.status.message}")
+        if self.dry_run:
+            return ExecutionResult(0, check.status)
+        try:
+            exit_code = await self._timed_run_async(partial(self._run_or_restore_async, runnable, runnable_metrics), runnable_metrics)
+        except _RunnableTimeoutError as error:
+            return self._handle_timeout(runnable, check, error)
+        return await self._offload(runnable_metrics, self._handle_completed, runnable, check, exit_code, runnable_metrics)
+
+    async def execute_all_async(self, runnables: Sequence[Runnable]) -> dict[str, int]:
+        """
+        Execute the runnables concurrently while respecting the dependencies between them.
+
+        At most max_concurrency runnables are executed at the same time and only if their required resources are available.
+        Runnables depending on a failed runnable are not executed and are not part of the result.
+
+        Returns
+        -------
+            The exit code of every executed runnable, by runnable id.
+
+        """
+        graph = RunnableGraph(runnables)
+        # The directory listings are shared by all runnables of this build
+        self.directory_listing.clear()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        resource_pool = ResourcePool(self.resource_limits)
+        resources_released = asyncio.Condition()
+        tasks: dict[str, asyncio.Task[ExecutionResult | None]] = {}
+
+        async def execute_after_dependencies(runnable_id: str) -> ExecutionResult | None:
+            dependency_results = await asyncio.gather(*(tasks[dependency_id] for dependency_id in graph.get_dependencies(runnable_id)))
+            if any(dependency_result is None or dependency_result.exit_code != 0 for dependency_result in dependency_results):
+                return None
+            runnable = graph.runnables[runnable_id]
+            async with resources_released:
+                await resources_released.wait_for(lambda: resource_pool.fits(runnable))
+                resource_pool.acquire(runnable)
+            try:
+                async with semaphore:
+                    execution_result = await self._measure_and_execute_async(runnable)
+            finally:
+                async with resources_released:
+                    resource_pool.release(runnable)
+                    resources_released.notify_all()
+            if execution_result.exit_code != 0:
+                logger.error(f"Runnable '{runnable.get_name()}' failed with exit code {execution_result.exit_code}. Its dependents will not be executed.")
+            return execution_result
+
+        for runnable_id in graph.get_topological_order():
+            tasks[runnable_id] = asyncio.create_task(execute_after_dependencies(runnable_id))
+        results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        # Also persist the run info of the runnables completed before a run() raised
+        await asyncio.get_running_loop().run_in_executor(self._thread_pool, self.flush)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return {runnable_id: execution_result.exit_code for runnable_id, task in tasks.items() if (execution_result := task.result()) is not None}
@@ -0,0 +1,31 @@
+import os
+import shutil
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+
+def get_temporary_file(file: Path) -> Path:
+    """Get a temporary file next to the file, unique per process and thread, ending with ``.tmp``."""
+    return file.with_name(f"{file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def _replace_atomically(file: Path, write: Callable[[Path], object]) -> None:
+    file.parent.mkdir(parents=True, exist_ok=True)
+    temporary_file = get_temporary_file(file)
+    try:
+        write(temporary_file)
+        os.replace(temporary_file, file)
+    except BaseException:
+        temporary_file.unlink(missing_ok=True)
+        raise
+
+
+def write_text_atomically(file: Path, content: str) -> None:
+    """Write the file such that readers see either its previous or its new content, never a partially written one."""
+    _replace_atomically(file, lambda temporary_file: temporary_file.write_text(content))
+
+
+def copy_file_atomically(source: Path, destination: Path) -> None:
+    """Copy the source such that readers of the destination never see a partially copied file."""
+    _replace_atomically(destination, lambda temporary_file: shutil.copyfile(source, temporary_file))
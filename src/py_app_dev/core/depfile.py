@@ -0,0 +1,66 @@
+import re
+from pathlib import Path
+
+# Line continuations: a backslash right before the line end
+_LINE_CONTINUATION = re.compile(r"\\\r?\n")
+
+
+def _split_words(line: str) -> list[str]:
+    """Split a makefile line at unescaped whitespace and resolve the escape sequences used by compilers."""
+    words: list[str] = []
+    word: list[str] = []
+    index = 0
+    while index < len(line):
+        character = line[index]
+        next_character = line[index + 1] if index + 1 < len(line) else ""
+        if character == "\\" and next_character in (" ", "#"):
+            word.append(next_character)
+            index += 2
+            continue
+        if character == "$" and next_character == "$":
+            word.append("$")
+            index += 2
+            continue
+        if character.isspace():
+            if word:
+                words.append("".join(word))
+                word = []
+        else:
+            word.append(character)
+        index += 1
+    if word:
+        words.append("".join(word))
+    return words
+
+
+def parse_depfile(content: str) -> list[str]:
+    """
+    Get the dependencies listed in a makefile-syntax depfile, as generated by ``gcc -MD``, ``clang -MMD`` or ``nvcc -MD``.
+
+    All rules are considered, e.g. the phony targets generated by ``-MP`` (which have no dependencies).
+    A colon ends the targets only if it is followed by whitespace or the line end, such that Windows drive letters are kept.
+
+    Returns
+    -------
+        The dependencies in the order they first appear, without duplicates.
+
+    """
+    dependencies: dict[str, None] = {}
+    for line in _LINE_CONTINUATION.sub(" ", content).splitlines():
+        in_dependencies = False
+        for word in _split_words(line):
+            if in_dependencies:
+                dependencies[word] = None
+            elif word.endswith(":"):
+                # Either the last target followed by the colon or the colon alone
+                in_dependencies = True
+    return list(dependencies)
+
+
+def read_depfile(depfile: Path) -> list[Path]:
+    """Read the dependencies from a depfile. Returns an empty list if the depfile does not exist."""
+    try:
+        content = depfile.read_text(errors="surrogateescape")
+    except FileNotFoundError:
+        return []
+    return [Path(dependency) for dependency in parse_depfile(content)]
@@ -0,0 +1,195 @@
+import json
+import os
+import threading
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .atomic_file import write_text_atomically
+
+
+@dataclass
+class RunnableMetrics:
+    runnable_id: str
+    name: str
+    #: Trace lane of the runnable. Defaults to the identifier of the thread which executed it.
+    thread_id: int
+    #: Start of the up-to-date check in seconds since the metrics collection started
+    start_s: float
+    #: Wall time of the up-to-date check
+    check_time_s: float = 0.0
+    #: Start of the run in seconds since the metrics collection started. None if the runnable did not run.
+    run_start_s: float | None = None
+    #: Wall time spent in run()
+    run_time_s: float = 0.0
+    #: Number of bytes read for calculating file hashes
+    hashed_bytes: int = 0
+    #: Wall time spent calculating file hashes
+    hash_time_s: float = 0.0
+
+    @property
+    def total_time_s(self) -> float:
+        return self.check_time_s + self.run_time_s
+
+    def to_run_info(self) -> dict[str, Any]:
+        return {
+            "check_time_s": round(self.check_time_s, 6),
+            "run_time_s": round(self.run_time_s, 6),
+            "hashed_bytes": self.hashed_bytes,
+            "hash_time_s": round(self.hash_time_s, 6),
+        }
+
+
+class RunDurationHistory:
+    """
+    Remembers the last run() duration of every runnable id in a JSON file.
+
+    The file is only read when durations are requested and only written when saved, not on every update.
+
+    Args:
+    ----
+        store_file: JSON file with the durations in seconds by runnable id
+
+    """
+
+    def __init__(self, store_file: Path) -> None:
+        self.store_file = store_file
+        self._durations: dict[str, float] | None = None
+        self._updated: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _read_store_file(self) -> dict[str, float]:
+        try:
+            durations: dict[str, float] = json.loads(self.store_file.read_text())
+        except (OSError, ValueError):
+            return {}
+        return durations
+
+    def _get_durations(self) -> dict[str, float]:
+        if self._durations is None:
+            self._durations = {**self._read_store_file(), **self._updated}
+        return self._durations
+
+    def get(self, runnable_id: str) -> float | None:
+        with self._lock:
+            return self._get_durations().get(runnable_id)
+
+    def get_all(self) -> dict[str, float]:
+        with self._lock:
+            return dict(self._get_durations())
+
+    def update(self, runnable_id: str, duration_s: float) -> None:
+        with self._lock:
+            if self._durations is not None:
+                self._durations[runnable_id] = duration_s
+            self._updated[runnable_id] = duration_s
+
+    def save(self) -> None:
+        """Write the updated durations, keeping the durations stored by others in the meantime."""
+        with self._lock:
+            if not self._updated:
+                return
+            durations = {**self._read_store_file(), **self._updated}
+            write_text_atomically(self.store_file, json.dumps(durations, separators=(",", ":")))
+            self._durations = durations
+            self._updated.clear()
+
+
+class ExecutionMetricsCollector:
+    """
+    Collects the timing and hashing costs of every executed runnable.
+
+    Args:
+    ----
+        run_durations: if given, the run() duration of every runnable which ran is recorded in it
+
+    """
+
+    def __init__(self, run_durations: RunDurationHistory | None = None) -> None:
+        self.run_durations = run_durations
+        self.metrics: list[RunnableMetrics] = []
+        self._start_time = time.perf_counter()
+        self._lock = threading.Lock()
+        self._current = threading.local()
+
+    def now(self) -> float:
+        """Get the seconds since the metrics collection started."""
+        return time.perf_counter() - self._start_time
+
+    def start(self, runnable_id: str, name: str, lane_id: int | None = None) -> RunnableMetrics:
+        """Start measuring a runnable. The lane id groups the trace events and defaults to the current thread."""
+        return RunnableMetrics(runnable_id, name, threading.get_ident() if lane_id is None else lane_id, self.now())
+
+    def add(self, runnable_metrics: RunnableMetrics) -> None:
+        with self._lock:
+            self.metrics.append(runnable_metrics)
+        if self.run_durations is not None and runnable_metrics.run_start_s is not None:
+            self.run_durations.update(runnable_metrics.runnable_id, runnable_metrics.run_time_s)
+
+    @contextmanager
+    def attribute(self, runnable_metrics: RunnableMetrics) -> Generator[RunnableMetrics, None, None]:
+        """Attribute the hashing done in the current thread to the given runnable."""
+        previous_metrics = getattr(self._current, "metrics", None)
+        self._current.metrics = runnable_metrics
+        try:
+            yield runnable_metrics
+        finally:
+            self._current.metrics = previous_metrics
+
+    @contextmanager
+    def measure(self, runnable_id: str, name: str) -> Generator[RunnableMetrics, None, None]:
+        """Collect the metrics of a runnable executed in the current thread."""
+        runnable_metrics = self.start(runnable_id, name)
+        try:
+            with self.attribute(runnable_metrics):
+                yield runnable_metrics
+        finally:
+            self.add(runnable_metrics)
+
+    def record_hashing(self, hashed_bytes: int, hash_time_s: float) -> None:
+        """Add hashing costs to the runnable measured in the current thread, if any."""
+        runnable_metrics: RunnableMetrics | None = getattr(self._current, "metrics", None)
+        if runnable_metrics is not None:
+            runnable_metrics.hashed_bytes += hashed_bytes
+            runnable_metrics.hash_time_s += hash_time_s
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """Convert the metrics to the Chrome trace event format (open with chrome://tracing or https://ui.perfetto.dev)."""
+        process_id = os.getpid()
+        events: list[dict[str, Any]] = []
+        with self._lock:
+            all_metrics = list(self.metrics)
+        for runnable_metrics in all_metrics:
+            common = {"pid": process_id, "tid": runnable_metrics.thread_id, "ph": "X", "cat": runnable_metrics.runnable_id}
+            events.append(
+                {
+                    **common,
+                    "name": f"check {runnable_metrics.name}",
+                    "ts": runnable_metrics.start_s * 1e6,
+                    "dur": runnable_metrics.check_time_s * 1e6,
+                    "args": {"hashed_bytes": runnable_metrics.hashed_bytes, "hash_time_s": runnable_metrics.hash_time_s},
+                }
+            )
+            if runnable_metrics.run_start_s is not None:
+                events.append({**common, "name": f"run {runnable_metrics.name}", "ts": runnable_metrics.run_start_s * 1e6, "dur": runnable_metrics.run_time_s * 1e6})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, trace_file: Path) -> None:
+        trace_file.parent.mkdir(parents=True, exist_ok=True)
+        trace_file.write_text(json.dumps(self.to_chrome_trace()))
+
+    def get_summary(self, count: int = 10) -> str:
+        """Get a table with the slowest runnables."""
+        with self._lock:
+            slowest = sorted(self.metrics, key=lambda runnable_metrics: runnable_metrics.total_time_s, reverse=True)[:count]
+        name_width = max([len("Runnable"), *(len(runnable_metrics.name) for runnable_metrics in slowest)])
+        lines = [f"{'Runnable':<{name_width}}  {'Total [s]':>10}  {'Check [s]':>10}  {'Hash [s]':>10}  {'Hashed [MB]':>12}  {'Run [s]':>10}"]
+        lines.extend(
+            f"{runnable_metrics.name:<{name_width}}  {runnable_metrics.total_time_s:>10.3f}  {runnable_metrics.check_time_s:>10.3f}  "
+            f"{runnable_metrics.hash_time_s:>10.3f}  {runnable_metrics.hashed_bytes / 1e6:>12.2f}  {runnable_metrics.run_time_s:>10.3f}"
+            for runnable_metrics in slowest
+        )
+        return "\n".join(lines)
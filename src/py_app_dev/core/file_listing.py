@@ -0,0 +1,113 @@
+import os
+import threading
+from fnmatch import fnmatchcase
+from pathlib import Path, PurePath
+
+from .logging import logger
+
+
+def has_wildcards(pattern: str) -> bool:
+    return any(character in pattern for character in "*?[")
+
+
+def _split_glob(pattern: str) -> tuple[Path, list[str]]:
+    """Split the pattern into the leading directory without wildcards and the remaining parts."""
+    parts = list(PurePath(pattern).parts)
+    wildcard_index = next((index for index, part in enumerate(parts) if has_wildcards(part)), len(parts))
+    return Path(*parts[:wildcard_index]) if wildcard_index else Path(), parts[wildcard_index:]
+
+
+def get_glob_base(pattern: str) -> Path:
+    """Get the directory containing all matches of the pattern, i.e. its leading parts without wildcards."""
+    return _split_glob(pattern)[0]
+
+
+def _match_parts(pattern_parts: list[str], path_parts: list[str]) -> bool:
+    if not pattern_parts:
+        return not path_parts
+    if pattern_parts[0] == "**":
+        return any(_match_parts(pattern_parts[1:], path_parts[index:]) for index in range(len(path_parts) + 1))
+    return bool(path_parts) and fnmatchcase(path_parts[0], pattern_parts[0]) and _match_parts(pattern_parts[1:], path_parts[1:])
+
+
+def glob_matches(pattern: str, path: Path) -> bool:
+    """Check whether the path matches the glob pattern. Both are made absolute before comparing them."""
+    return _match_parts(list(Path(os.path.abspath(pattern)).parts), list(Path(os.path.abspath(path)).parts))
+
+
+class DirectoryListingCache:
+    """
+    Lists every directory only once with os.scandir and expands glob patterns based on these listings.
+
+    It is meant to be shared by all glob patterns of one build, such that patterns over the same tree do not list it again.
+    ``*``, ``?`` and ``[...]`` match within one path part, ``**`` matches any number of directories.
+    Like pathlib, ``**`` does not descend into symbolic links to directories, which could form cycles.
+    Clear the cache when files might have been created or removed.
+    """
+
+    def __init__(self) -> None:
+        self._listings: dict[str, tuple[list[str], list[str], set[str]]] = {}
+        self._lock = threading.Lock()
+
+    def list_directory(self, directory: str) -> tuple[list[str], list[str]]:
+        """Get the names of the subdirectories and of the files in the directory. Both are empty if it can not be listed."""
+        directories, files, _ = self._list_directory(directory)
+        return directories, files
+
+    def _list_directory(self, directory: str) -> tuple[list[str], list[str], set[str]]:
+        """Get the names of the subdirectories, of the files and of the subdirectories which are symbolic links."""
+        with self._lock:
+            listing = self._listings.get(directory)
+        if listing is not None:
+            return listing
+        directories: list[str] = []
+        files: list[str] = []
+        symlinked_directories: set[str] = set()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        directories.append(entry.name)
+                        if entry.is_symlink():
+                            symlinked_directories.add(entry.name)
+                    else:
+                        files.append(entry.name)
+        except OSError as error:
+            # Missing directories are expected, e.g. for patterns of outputs not generated yet
+            if not isinstance(error, (FileNotFoundError, NotADirectoryError)):
+                logger.warning(f"Directory '{directory}' can not be listed and is considered empty: {error}")
+        listing = (directories, files, symlinked_directories)
+        with self._lock:
+            self._listings[directory] = listing
+        return listing
+
+    def clear(self) -> None:
+        with self._lock:
+            self._listings.clear()
+
+    def glob(self, pattern: str) -> list[Path]:
+        """Get the files matching the pattern, sorted. Relative patterns are relative to the current working directory."""
+        base, parts = _split_glob(pattern)
+        if not parts:
+            return [base] if base.is_file() else []
+        matches: set[str] = set()
+        self._expand(str(base), parts, matches)
+        return sorted(Path(match) for match in matches)
+
+    def _expand(self, directory: str, parts: list[str], matches: set[str]) -> None:
+        part, remaining_parts = parts[0], parts[1:]
+        subdirectories, files, symlinked_directories = self._list_directory(directory)
+        if part == "**":
+            if remaining_parts:
+                self._expand(directory, remaining_parts, matches)
+            else:
+                matches.update(os.path.join(directory, name) for name in files)
+            for subdirectory in subdirectories:
+                if subdirectory not in symlinked_directories:
+                    self._expand(os.path.join(directory, subdirectory), parts, matches)
+        elif remaining_parts:
+            for subdirectory in subdirectories:
+                if fnmatchcase(subdirectory, part):
+                    self._expand(os.path.join(directory, subdirectory), remaining_parts, matches)
+        else:
+            matches.update(os.path.join(directory, name) for name in files if fnmatchcase(name, part))
@@ -0,0 +1,213 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from .hashing import FileStat
+from .logging import logger
+
+
+class FileWatcher(ABC):
+    """
+    Watches files and directories (recursively) for changes.
+
+    Args:
+    ----
+        paths: files and directories to be watched. They do not need to exist yet.
+        debounce_sec: time without further changes after which a change is reported.
+            Editors often write a file in several steps which shall be reported as one change.
+
+    """
+
+    DEFAULT_DEBOUNCE_SEC = 0.05
+
+    def __init__(self, paths: list[Path], debounce_sec: float = DEFAULT_DEBOUNCE_SEC) -> None:
+        self.paths = [Path(os.path.abspath(path)) for path in paths]
+        self.debounce_sec = debounce_sec
+
+    def _get_watched_paths(self, changed_path: Path) -> set[Path]:
+        """Get the watched paths affected by a change of the given path, of a file inside a watched directory or of a parent directory."""
+        return {path for path in self.paths if changed_path == path or path in changed_path.parents or changed_path in path.parents}
+
+    def wait_for_changes(self, timeout_sec: float | None = None) -> set[Path]:
+        """
+        Wait until at least one of the watched paths changed.
+
+        Returns
+        -------
+            The changed watched paths (absolute) or an empty set if nothing changed before the timeout.
+
+        """
+        changed_paths = self._poll_changes(timeout_sec)
+        while changed_paths:
+            more_changed_paths = self._poll_changes(self.debounce_sec)
+            if not more_changed_paths:
+                break
+            changed_paths |= more_changed_paths
+        return changed_paths
+
+    @abstractmethod
+    def _poll_changes(self, timeout_sec: float | None) -> set[Path]:
+        """Wait for the next changes. Returns an empty set on timeout."""
+
+    def close(self) -> None:
+        """Release the operating system resources."""
+        return None
+
+    def __enter__(self) -> "FileWatcher":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+
+class PollingFileWatcher(FileWatcher):
+    """Detects changes by periodically comparing the stats of all watched files."""
+
+    DEFAULT_INTERVAL_SEC = 0.5
+
+    def __init__(self, paths: list[Path], debounce_sec: float = FileWatcher.DEFAULT_DEBOUNCE_SEC, interval_sec: float = DEFAULT_INTERVAL_SEC) -> None:
+        super().__init__(paths, debounce_sec)
+        self.interval_sec = interval_sec
+        self._snapshots = {path: self._take_snapshot(path) for path in self.paths}
+
+    @staticmethod
+    def _take_snapshot(path: Path) -> object:
+        if not path.is_dir():
+            return FileStat.from_path(path) or path.exists()
+        return sorted((os.path.relpath(directory, path), name, FileStat.from_path(Path(directory, name))) for directory, _, files in os.walk(path) for name in files)
+
+    def _poll_changes(self, timeout_sec: float | None) -> set[Path]:
+        deadline = None if timeout_sec is None else time.monotonic() + timeout_sec
+        while True:
+            changed_paths = set()
+            for path, snapshot in self._snapshots.items():
+                new_snapshot = self._take_snapshot(path)
+                if new_snapshot != snapshot:
+                    self._snapshots[path] = new_snapshot
+                    changed_paths.add(path)
+            if changed_paths:
+                return changed_paths
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval_sec if deadline is None else max(0.0, min(self.interval_sec, deadline - time.monotonic())))
+
+
+class InotifyFileWatcher(FileWatcher):
+    """
+    Detects changes with the Linux inotify API.
+
+    Files are watched through their parent directory, such that files replaced by editors (write to a temporary file and rename) are detected.
+    """
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = os.O_NONBLOCK
+    IN_CLOEXEC = os.O_CLOEXEC
+    WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+    _EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, paths: list[Path], debounce_sec: float = FileWatcher.DEFAULT_DEBOUNCE_SEC) -> None:
+        super().__init__(paths, debounce_sec)
+        self._libc = self._load_libc()
+        if self._libc is None:
+            raise OSError("inotify is not available on this platform.")
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "Failed to initialize inotify.")
+        self._watched_directories: dict[int, Path] = {}
+        self._add_watches()
+
+    @staticmethod
+    def _load_libc() -> ctypes.CDLL | None:
+        if not sys.platform.startswith("linux"):
+            return None
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            return None
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return cls._load_libc() is not None
+
+    def _add_watch(self, directory: Path) -> None:
+        if self._libc is None:
+            return
+        watch_descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.WATCH_MASK)
+        if watch_descriptor < 0:
+            logger.debug(f"Failed to watch directory '{directory}' (errno {ctypes.get_errno()}).")
+            return
+        self._watched_directories[watch_descriptor] = directory
+
+    def _add_watches(self) -> None:
+        """Watch the existing directories of all paths. Adding an already watched directory again is harmless."""
+        for path in self.paths:
+            if path.is_dir():
+                self._add_watch(path)
+                for directory, subdirectories, _ in os.walk(path):
+                    for subdirectory in subdirectories:
+                        self._add_watch(Path(directory, subdirectory))
+            # Watch the nearest existing parent, to detect the creation of the path or of its parents
+            existing_parent = next((parent for parent in path.parents if parent.is_dir()), None)
+            if existing_parent is not None:
+                self._add_watch(existing_parent)
+
+    def _poll_changes(self, timeout_sec: float | None) -> set[Path]:
+        readable, _, _ = select.select([self._fd], [], [], timeout_sec)
+        if not readable:
+            return set()
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed_paths: set[Path] = set()
+        directories_created = False
+        offset = 0
+        while offset < len(buffer):
+            watch_descriptor, mask, _, name_length = self._EVENT_HEADER.unpack_from(buffer, offset)
+            offset += self._EVENT_HEADER.size
+            name = os.fsdecode(buffer[offset : offset + name_length].rstrip(b"\0"))
+            offset += name_length
+            if mask & self.IN_Q_OVERFLOW:
+                # Events were lost, consider everything changed
+                changed_paths.update(self.paths)
+                continue
+            directory = self._watched_directories.get(watch_descriptor)
+            if directory is None:
+                continue
+            changed_path = directory / name if name else directory
+            changed_paths |= self._get_watched_paths(changed_path)
+            if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                directories_created = True
+        if directories_created:
+            self._add_watches()
+        return changed_paths
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_file_watcher(paths: list[Path], debounce_sec: float = FileWatcher.DEFAULT_DEBOUNCE_SEC) -> FileWatcher:
+    """Create an inotify based watcher if available, otherwise a watcher polling the file stats."""
+    if InotifyFileWatcher.is_available():
+        return InotifyFileWatcher(paths, debounce_sec)
+    return PollingFileWatcher(paths, debounce_sec)
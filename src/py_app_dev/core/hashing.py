@@ -0,0 +1,251 @@
+import fnmatch
+import hashlib
+import json
+import mmap
+import os
+import stat
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from .atomic_file import write_text_atomically
+from .exceptions import UserNotificationException
+from .logging import logger
+
+
+class FileStat(NamedTuple):
+    """File status fields which change whenever the file content is modified."""
+
+    mtime_ns: int
+    size: int
+    inode: int
+
+    @classmethod
+    def from_stat_result(cls, stat_result: os.stat_result) -> "FileStat":
+        return cls(stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino)
+
+    @classmethod
+    def from_path(cls, path: Path) -> "FileStat | None":
+        """Get the stat of a regular file. Returns None for directories and missing paths."""
+        try:
+            stat_result = path.stat()
+        except OSError:
+            return None
+        return cls.from_stat_result(stat_result) if stat.S_ISREG(stat_result.st_mode) else None
+
+
+class FileHasher:
+    """
+    Calculate file content hashes without loading the whole file into memory.
+
+    Small files are read in fixed-size chunks into a reused buffer.
+    Files larger than the mmap threshold are memory mapped and hashed chunk by chunk.
+
+    Args:
+    ----
+        algorithm: any algorithm supported by hashlib, e.g. sha256 or blake2b
+        chunk_size: number of bytes hashed at once
+        mmap_threshold: minimum file size in bytes for using mmap. Use None to disable mmap.
+
+    """
+
+    DEFAULT_ALGORITHM = "sha256"
+    DEFAULT_CHUNK_SIZE = 1024 * 1024
+    DEFAULT_MMAP_THRESHOLD = 64 * 1024 * 1024
+
+    def __init__(
+        self,
+        algorithm: str = DEFAULT_ALGORITHM,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        mmap_threshold: int | None = DEFAULT_MMAP_THRESHOLD,
+    ) -> None:
+        if not self._is_supported(algorithm):
+            supported_algorithms = sorted(name for name in hashlib.algorithms_guaranteed if self._is_supported(name))
+            raise UserNotificationException(f"Hash algorithm '{algorithm}' is not supported. Use one of: {', '.join(supported_algorithms)}.")
+        self.algorithm = algorithm
+        self.chunk_size = chunk_size
+        self.mmap_threshold = mmap_threshold
+
+    @staticmethod
+    def _is_supported(algorithm: str) -> bool:
+        if algorithm not in hashlib.algorithms_available:
+            return False
+        try:
+            # Variable length algorithms (e.g. shake_128) require the digest length, which a file hash does not define
+            return hashlib.new(algorithm).digest_size > 0
+        except ValueError:
+            # e.g. disabled by the security policy of the OpenSSL library
+            return False
+
+    def hash_file(self, path: Path) -> str:
+        file_hash = hashlib.new(self.algorithm)
+        with open(path, "rb") as file:
+            file_size = os.fstat(file.fileno()).st_size
+            if file_size and self.mmap_threshold is not None and file_size >= self.mmap_threshold:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file, memoryview(mapped_file) as content:
+                    for offset in range(0, file_size, self.chunk_size):
+                        file_hash.update(content[offset : offset + self.chunk_size])
+            else:
+                buffer = bytearray(self.chunk_size)
+                with memoryview(buffer) as view:
+                    while read_bytes := file.readinto(buffer):
+                        file_hash.update(view[:read_bytes])
+        return file_hash.hexdigest()
+
+
+class FileHashCache:
+    """
+    Thread-safe LRU cache of file hashes keyed by the file path and its stat.
+
+    A file is hashed again only if its modification time, size or inode changed.
+    The cache can be saved to and loaded from a single JSON file to be reused across processes.
+
+    Args:
+    ----
+        algorithm: hash algorithm of the cached hashes. Stored entries of another algorithm are ignored.
+        max_entries: maximum number of cached hashes. The least recently used ones are discarded first.
+        store_file: optional file to save the cache to and load it from
+
+    """
+
+    DEFAULT_MAX_ENTRIES = 100_000
+
+    def __init__(self, algorithm: str, max_entries: int = DEFAULT_MAX_ENTRIES, store_file: Path | None = None) -> None:
+        self.algorithm = algorithm
+        self.max_entries = max_entries
+        self.store_file = store_file
+        self._entries: OrderedDict[tuple[str, FileStat], str] = OrderedDict()
+        # Whether hashes were added since the cache was saved
+        self._modified = False
+        self._lock = threading.Lock()
+        if self.store_file:
+            self.load()
+
+    @staticmethod
+    def _key(path: Path, file_stat: FileStat) -> tuple[str, FileStat]:
+        return os.path.abspath(path), file_stat
+
+    def get(self, path: Path, file_stat: FileStat) -> str | None:
+        key = self._key(path, file_stat)
+        with self._lock:
+            file_hash = self._entries.get(key)
+            if file_hash is not None:
+                self._entries.move_to_end(key)
+            return file_hash
+
+    def put(self, path: Path, file_stat: FileStat, file_hash: str) -> None:
+        with self._lock:
+            self._put(self._key(path, file_stat), file_hash)
+            self._modified = True
+
+    def _put(self, key: tuple[str, FileStat], file_hash: str) -> None:
+        self._entries[key] = file_hash
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def load(self) -> None:
+        if not self.store_file or not self.store_file.exists():
+            return
+        try:
+            content = json.loads(self.store_file.read_text())
+        except (OSError, ValueError) as error:
+            logger.warning(f"Ignoring file hash cache '{self.store_file}'. It could not be read: {error}")
+            return
+        if content.get("hash_algorithm") != self.algorithm:
+            return
+        with self._lock:
+            for path_str, mtime_ns, size, inode, file_hash in content.get("entries", []):
+                self._put((path_str, FileStat(mtime_ns, size, inode)), file_hash)
+
+    def save(self) -> None:
+        if not self.store_file:
+            return
+        with self._lock:
+            if not self._modified:
+                return
+            self._modified = False
+            entries = [[path_str, *file_stat, file_hash] for (path_str, file_stat), file_hash in self._entries.items()]
+        write_text_atomically(self.store_file, json.dumps({"hash_algorithm": self.algorithm, "entries": entries}, separators=(",", ":")))
+
+
+class _SubtreeDigest(NamedTuple):
+    signature: tuple[tuple[str, str, Any], ...]
+    digest: str
+    file_hashes: dict[tuple[str, FileStat], str | None]
+
+
+class DirectoryHasher:
+    """
+    Calculate a Merkle tree digest of a directory.
+
+    The digest of a directory is the hash over the names and digests of its entries.
+    The digest of every subtree is cached together with the stat of its files and the digests of its subdirectories,
+    such that after a file changed only the digests of the directories on its path are calculated again.
+
+    Args:
+    ----
+        file_hash_provider: returns the hash of a file with the given stat
+        algorithm: hash algorithm for the directory digests
+        include_patterns: glob patterns of the files to be hashed, relative to the hashed directory. Defaults to all files.
+        exclude_patterns: glob patterns of the files and directories to be ignored, relative to the hashed directory
+
+    """
+
+    def __init__(
+        self,
+        file_hash_provider: Callable[[Path, FileStat], str | None],
+        algorithm: str = FileHasher.DEFAULT_ALGORITHM,
+        include_patterns: list[str] | None = None,
+        exclude_patterns: list[str] | None = None,
+    ) -> None:
+        self.file_hash_provider = file_hash_provider
+        self.algorithm = algorithm
+        self.include_patterns = include_patterns
+        self.exclude_patterns = exclude_patterns or []
+        self._subtrees: dict[str, _SubtreeDigest] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _matches(relative_path: str, patterns: list[str]) -> bool:
+        return any(fnmatch.fnmatchcase(relative_path, pattern) for pattern in patterns)
+
+    def hash_directory(self, directory: Path) -> str:
+        return self._hash_subtree(Path(os.path.abspath(directory)), "")
+
+    def _hash_subtree(self, directory: Path, relative_directory: str) -> str:
+        signature: list[tuple[str, str, Any]] = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                relative_path = f"{relative_directory}{entry.name}"
+                if self._matches(relative_path, self.exclude_patterns):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    signature.append(("D", entry.name, self._hash_subtree(Path(entry.path), f"{relative_path}/")))
+                elif entry.is_symlink():
+                    signature.append(("L", entry.name, os.readlink(entry.path)))
+                elif entry.is_file(follow_symlinks=False) and (self.include_patterns is None or self._matches(relative_path, self.include_patterns)):
+                    signature.append(("F", entry.name, FileStat.from_stat_result(entry.stat())))
+        signature.sort()
+        subtree_signature = tuple(signature)
+        with self._lock:
+            previous_subtree = self._subtrees.get(str(directory))
+        if previous_subtree is not None and previous_subtree.signature == subtree_signature:
+            return previous_subtree.digest
+        previous_file_hashes = previous_subtree.file_hashes if previous_subtree else {}
+        file_hashes: dict[tuple[str, FileStat], str | None] = {}
+        digest = hashlib.new(self.algorithm)
+        for kind, name, value in subtree_signature:
+            if kind == "F":
+                file_key = (name, value)
+                entry_hash = previous_file_hashes[file_key] if file_key in previous_file_hashes else self.file_hash_provider(directory / name, value)
+                file_hashes[file_key] = entry_hash
+            else:
+                entry_hash = value
+            digest.update(f"{kind} {name} {entry_hash}\n".encode())
+        subtree = _SubtreeDigest(subtree_signature, digest.hexdigest(), file_hashes)
+        with self._lock:
+            self._subtrees[str(directory)] = subtree
+        return subtree.digest
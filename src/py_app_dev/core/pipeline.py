@@ -1,8 +1,13 @@
 import importlib
+import threading
 from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
+from functools import partial
 from importlib.util import module_from_spec, spec_from_file_location
 from pathlib import Path
+from types import ModuleType
 from typing import (
     Any,
     Generic,
@@ -13,6 +18,8 @@ from typing import (
 from mashumaro import DataClassDictMixin
 
 from py_app_dev.core.exceptions import UserNotificationException
+from py_app_dev.core.logging import logger
+from py_app_dev.core.runnable import Runnable, RunnableGraph
 
 
 @dataclass
@@ -31,10 +38,15 @@ class PipelineStepConfig(DataClassDictMixin):
     timeout_sec: int | None = None
     #: Custom step configuration
     config: dict[str, Any] | None = None
+    #: Groups which must complete before the group of this step starts. By default, a group depends on the previous group.
+    depends_on: list[str] | None = None
 
 
 PipelineConfig: TypeAlias = list[PipelineStepConfig] | OrderedDict[str, list[PipelineStepConfig]]
 
+#: User step modules by resolved file path and modification time
+ModuleCache: TypeAlias = dict[tuple[Path, int], ModuleType]
+
 TPipelineStep = TypeVar("TPipelineStep")
 
 
@@ -44,31 +56,131 @@ class PipelineStep:
     pass
 
 
-@dataclass
+class LazyStepClass(Generic[TPipelineStep]):
+    """
+    Handle to a step class which is only imported when it is resolved for the first time.
+
+    Handles with the same ``target`` (e.g. module and class name) are equal, otherwise only the handle is equal to itself.
+    """
+
+    # Steps might be resolved from several threads. Importing their modules concurrently is not safe.
+    _resolve_lock = threading.RLock()
+
+    def __init__(self, load: Callable[[], type[TPipelineStep]], target: Hashable | None = None) -> None:
+        self._load = load
+        self.target = target
+        self._class: type[TPipelineStep] | None = None
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LazyStepClass):
+            return NotImplemented
+        if self.target is None or other.target is None:
+            return self is other
+        return bool(self.target == other.target)
+
+    def __hash__(self) -> int:
+        return id(self) if self.target is None else hash(self.target)
+
+    def resolve(self) -> type[TPipelineStep]:
+        with self._resolve_lock:
+            if self._class is None:
+                self._class = self._load()
+            return self._class
+
+
+@dataclass(init=False)
 class PipelineStepReference(Generic[TPipelineStep]):
-    """Once a Step is found, keep the Step class reference to be able to instantiate it later."""
+    """
+    Once a Step is found, keep the Step class reference to be able to instantiate it later.
+
+    The step class is passed as ``_class`` (positionally or as keyword), either as class or as LazyStepClass.
+    ``class_handle`` is accepted as well, such that dataclasses.replace() works with both names.
+    """
 
     group_name: str | None
-    _class: type[TPipelineStep]
+    #: Step class or a handle which imports it on first use
+    class_handle: type[TPipelineStep] | LazyStepClass[TPipelineStep]
     config: dict[str, Any] | None = None
+    #: Step timeout in seconds. It shall be passed to the step runnable to be enforced by the executor.
+    timeout_sec: int | None = None
+    #: Step name from the pipeline configuration
+    name: str | None = None
+    #: Groups which must complete before the group of this step starts. None if not declared.
+    depends_on: list[str] | None = None
+
+    def __init__(
+        self,
+        group_name: str | None,
+        _class: type[TPipelineStep] | LazyStepClass[TPipelineStep] | None = None,
+        config: dict[str, Any] | None = None,
+        timeout_sec: int | None = None,
+        name: str | None = None,
+        depends_on: list[str] | None = None,
+        class_handle: type[TPipelineStep] | LazyStepClass[TPipelineStep] | None = None,
+    ) -> None:
+        step_class = _class if _class is not None else class_handle
+        if step_class is None:
+            raise TypeError("PipelineStepReference requires the step class ('_class').")
+        self.group_name = group_name
+        self.class_handle = step_class
+        self.config = config
+        self.timeout_sec = timeout_sec
+        self.name = name
+        self.depends_on = depends_on
+
+    @property
+    def _class(self) -> type[TPipelineStep]:
+        if isinstance(self.class_handle, LazyStepClass):
+            return self.class_handle.resolve()
+        return self.class_handle
 
 
 class PipelineLoader(Generic[TPipelineStep]):
     def __init__(self, pipeline_config: PipelineConfig, project_root_dir: Path) -> None:
         self.pipeline_config = pipeline_config
         self.project_root_dir = project_root_dir
+        # Every user file is executed only once, even if it defines several steps
+        self._module_cache: ModuleCache = {}
 
-    def load_steps(self) -> list[PipelineStepReference[TPipelineStep]]:
-        result = []
+    def load_steps(self, groups: list[str] | None = None, steps: list[str] | None = None) -> list[PipelineStepReference[TPipelineStep]]:
+        """
+        Get the references to the configured steps. The step classes are only imported when they are used.
+
+        Args:
+        ----
+            groups: if given, only the steps of these groups are loaded
+            steps: if given, only the steps with these names are loaded
+
+        """
         if isinstance(self.pipeline_config, list):
             # Handle List[PipelineStepConfig]
-            result.extend(self._load_steps(None, self.pipeline_config, self.project_root_dir))
+            steps_config_by_group: dict[str | None, list[PipelineStepConfig]] = {None: self.pipeline_config}
         elif isinstance(self.pipeline_config, OrderedDict):
             # Handle OrderedDict[str, List[PipelineStepConfig]]
-            for group_name, steps_config in self.pipeline_config.items():
-                result.extend(self._load_steps(group_name, steps_config, self.project_root_dir))
+            steps_config_by_group = dict(self.pipeline_config.items())
         else:
             raise UserNotificationException("Invalid pipeline configuration. Expected a list or an ordered dictionary.")
+        unknown_groups = set(groups or []) - set(steps_config_by_group)
+        if unknown_groups:
+            raise UserNotificationException(f"Unknown pipeline groups: {', '.join(sorted(unknown_groups))}. Please check your pipeline configuration.")
+        unknown_dependencies = {
+            group_name
+            for steps_config in steps_config_by_group.values()
+            for step_config in steps_config
+            for group_name in step_config.depends_on or []
+            if group_name not in steps_config_by_group
+        }
+        if unknown_dependencies:
+            raise UserNotificationException(f"Steps depend on unknown pipeline groups: {', '.join(sorted(unknown_dependencies))}. Please check your pipeline configuration.")
+        unknown_steps = set(steps or []) - {step_config.step for steps_config in steps_config_by_group.values() for step_config in steps_config}
+        if unknown_steps:
+            raise UserNotificationException(f"Unknown pipeline steps: {', '.join(sorted(unknown_steps))}. Please check your pipeline configuration.")
+        result = []
+        for group_name, steps_config in steps_config_by_group.items():
+            if groups is not None and group_name not in groups:
+                continue
+            selected_steps_config = [step_config for step_config in steps_config if steps is None or step_config.step in steps]
+            result.extend(self._load_steps(group_name, selected_steps_config, self.project_root_dir, self._module_cache))
         return result
 
     @staticmethod
@@ -76,33 +188,61 @@ class PipelineLoader(Generic[TPipelineStep]):
         group_name: str | None,
         steps_config: list[PipelineStepConfig],
         project_root_dir: Path,
+        module_cache: ModuleCache | None = None,
     ) -> list[PipelineStepReference[TPipelineStep]]:
         result = []
         for step_config in steps_config:
             step_class_name = step_config.class_name or step_config.step
+            step_class: LazyStepClass[TPipelineStep]
             if step_config.module:
-                step_class = PipelineLoader[TPipelineStep]._load_module_step(step_config.module, step_class_name)
+                step_class = LazyStepClass(
+                    partial(PipelineLoader[TPipelineStep]._load_module_step, step_config.module, step_class_name),
+                    ("module", step_config.module, step_class_name),
+                )
             elif step_config.file:
-                step_class = PipelineLoader[TPipelineStep]._load_user_step(project_root_dir.joinpath(step_config.file), step_class_name)
+                step_file = project_root_dir.joinpath(step_config.file)
+                step_class = LazyStepClass(
+                    partial(PipelineLoader[TPipelineStep]._load_user_step, step_file, step_class_name, module_cache),
+                    ("file", step_file, step_class_name),
+                )
             else:
                 raise UserNotificationException(f"Step '{step_class_name}' has no 'module' nor 'file' defined. Please check your pipeline configuration.")
-            result.append(PipelineStepReference(group_name, step_class, step_config.config))
+            result.append(PipelineStepReference(group_name, step_class, step_config.config, step_config.timeout_sec, step_config.step, step_config.depends_on))
         return result
 
     @staticmethod
-    def _load_user_step(python_file: Path, step_class_name: str) -> type[TPipelineStep]:
-        # Create a module specification from the file path
-        spec = spec_from_file_location(f"user__{step_class_name}", python_file)
-        if spec and spec.loader:
-            step_module = module_from_spec(spec)
-            # Import the module
-            spec.loader.exec_module(step_module)
+    def _load_user_step(python_file: Path, step_class_name: str, module_cache: ModuleCache | None = None) -> type[TPipelineStep]:
+        step_module = PipelineLoader._load_user_module(python_file, f"user__{step_class_name}", module_cache)
+        try:
+            step_class: type[TPipelineStep] = getattr(step_module, step_class_name)
+        except AttributeError:
+            raise UserNotificationException(f"Could not load class '{step_class_name}' from file '{python_file}'. Please check your pipeline configuration.") from None
+        return step_class
+
+    @staticmethod
+    def _load_user_module(python_file: Path, module_name: str, module_cache: ModuleCache | None = None) -> ModuleType:
+        cache_key = None
+        if module_cache is not None:
+            resolved_file = python_file.resolve()
             try:
-                step_class = getattr(step_module, step_class_name)
-            except AttributeError:
-                raise UserNotificationException(f"Could not load class '{step_class_name}' from file '{python_file}'. Please check your pipeline configuration.") from None
-            return step_class
-        raise UserNotificationException(f"Could not load file '{python_file}'. Please check the file for any errors.")
+                # A modified file is executed again
+                cache_key = (resolved_file, resolved_file.stat().st_mtime_ns)
+            except OSError:
+                raise UserNotificationException(f"Could not load file '{python_file}'. Please check the file for any errors.") from None
+            if cache_key in module_cache:
+                return module_cache[cache_key]
+            # All steps of the file share one module
+            module_name = f"user__{resolved_file.stem}"
+        # Create a module specification from the file path
+        spec = spec_from_file_location(module_name, python_file)
+        if not (spec and spec.loader):
+            raise UserNotificationException(f"Could not load file '{python_file}'. Please check the file for any errors.")
+        step_module = module_from_spec(spec)
+        # Import the module
+        spec.loader.exec_module(step_module)
+        if module_cache is not None and cache_key is not None:
+            module_cache[cache_key] = step_module
+        return step_module
 
     @staticmethod
     def _load_module_step(module_name: str, step_class_name: str) -> type[TPipelineStep]:
@@ -114,3 +254,132 @@ class PipelineLoader(Generic[TPipelineStep]):
         except AttributeError:
             raise UserNotificationException(f"Could not load class '{step_class_name}' from module '{module_name}'. Please check your pipeline configuration.") from None
         return step_class
+
+
+class PipelineRunner(Generic[TPipelineStep]):
+    """
+    Executes the pipeline steps group by group.
+
+    The steps of a group are executed in their configured order and the group stops at the first failing step.
+    Groups whose dependencies completed successfully are executed concurrently.
+    A group depends on the groups listed in the ``depends_on`` of its steps or, if none is declared, on the previous group.
+    Dependencies on groups which are not part of the step references (e.g. filtered out) are ignored.
+
+    Args:
+    ----
+        step_references: steps to be executed, e.g. from PipelineLoader.load_steps()
+        max_workers: maximum number of groups executed at the same time. Defaults to the number of groups.
+
+    """
+
+    def __init__(self, step_references: list[PipelineStepReference[TPipelineStep]], max_workers: int | None = None) -> None:
+        self.groups: dict[str | None, list[PipelineStepReference[TPipelineStep]]] = {}
+        for step_reference in step_references:
+            self.groups.setdefault(step_reference.group_name, []).append(step_reference)
+        self.max_workers = max_workers
+        self.group_dependencies = self._collect_group_dependencies()
+
+    def _collect_group_dependencies(self) -> dict[str | None, set[str | None]]:
+        group_dependencies: dict[str | None, set[str | None]] = {}
+        previous_group_name: str | None = None
+        for index, (group_name, step_references) in enumerate(self.groups.items()):
+            declared_dependencies = [step_reference.depends_on for step_reference in step_references if step_reference.depends_on is not None]
+            if declared_dependencies:
+                group_dependencies[group_name] = {dependency for dependencies in declared_dependencies for dependency in dependencies if dependency in self.groups}
+            else:
+                group_dependencies[group_name] = {previous_group_name} if index else set()
+            previous_group_name = group_name
+        # Groups can only depend on groups defined before them, otherwise they could depend on each other
+        defined_groups: set[str | None] = set()
+        for group_name, dependencies in group_dependencies.items():
+            if not dependencies <= defined_groups:
+                raise UserNotificationException(
+                    f"Group '{group_name}' depends on groups defined after it: {', '.join(sorted(str(dependency) for dependency in dependencies - defined_groups))}. "
+                    "Please reorder your pipeline configuration."
+                )
+            defined_groups.add(group_name)
+        return group_dependencies
+
+    def select_affected(self, changed_paths: Iterable[Path], create_runnable: Callable[[PipelineStepReference[TPipelineStep]], Runnable]) -> "PipelineRunner[TPipelineStep]":
+        """
+        Get a runner for the steps affected by the changed files and for their downstream steps.
+
+        The steps are created with ``create_runnable`` only to get their declared inputs and outputs (see RunnableGraph.get_affected()),
+        their run info is not read. Steps without affected inputs are skipped, even if they do not manage their dependencies.
+        The groups of the selected steps keep their dependencies, also those through groups without selected steps.
+
+        Args:
+        ----
+            changed_paths: changed files or directories, e.g. from ``git diff --name-only``. Relative paths are relative to the current working directory.
+            create_runnable: creates the runnable of a step
+
+        """
+        step_references = [step_reference for step_references in self.groups.values() for step_reference in step_references]
+        runnables = [create_runnable(step_reference) for step_reference in step_references]
+        affected_ids = set(RunnableGraph(runnables).get_affected(changed_paths))
+        selected_runner = PipelineRunner(
+            [step_reference for step_reference, runnable in zip(step_references, runnables, strict=True) if runnable.get_id() in affected_ids],
+            self.max_workers,
+        )
+        logger.info(f"{len(affected_ids)} of {len(step_references)} steps are affected by the changed files.")
+        selected_runner.group_dependencies = {group_name: self._get_selected_dependencies(group_name, selected_runner.groups.keys()) for group_name in selected_runner.groups}
+        return selected_runner
+
+    def _get_selected_dependencies(self, group_name: str | None, selected_groups: Iterable[str | None]) -> set[str | None]:
+        """Get the selected groups the group depends on, directly or through groups which are not selected."""
+        selected_dependencies: set[str | None] = set()
+        pending = list(self.group_dependencies[group_name])
+        visited: set[str | None] = set()
+        while pending:
+            dependency = pending.pop()
+            if dependency in visited:
+                continue
+            visited.add(dependency)
+            if dependency in selected_groups:
+                selected_dependencies.add(dependency)
+            else:
+                pending.extend(self.group_dependencies[dependency])
+        return selected_dependencies
+
+    def _run_group(self, group_name: str | None, execute_step: Callable[[PipelineStepReference[TPipelineStep]], int]) -> int:
+        for step_reference in self.groups[group_name]:
+            exit_code = execute_step(step_reference)
+            if exit_code != 0:
+                logger.error(f"Step '{step_reference.name}' of group '{group_name}' failed with exit code {exit_code}.")
+                return exit_code
+        return 0
+
+    def run(self, execute_step: Callable[[PipelineStepReference[TPipelineStep]], int]) -> dict[str | None, int]:
+        """
+        Execute all groups. The execute_step callable is called from several threads when groups run concurrently.
+
+        Groups depending on a failed group are not executed and are not part of the result.
+
+        Returns
+        -------
+            The exit code of every executed group (the exit code of its first failing step or 0), by group name.
+
+        """
+        pending_groups = dict(self.group_dependencies)
+        exit_codes: dict[str | None, int] = {}
+        not_executed: set[str | None] = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers or max(len(self.groups), 1), thread_name_prefix="pipeline_group") as pool:
+            running: dict[Future[int], str | None] = {}
+            while pending_groups or running:
+                for group_name, dependencies in list(pending_groups.items()):
+                    failed_dependencies = {dependency for dependency in dependencies if dependency in not_executed or exit_codes.get(dependency, 0) != 0}
+                    if failed_dependencies:
+                        del pending_groups[group_name]
+                        not_executed.add(group_name)
+                        logger.error(
+                            f"Group '{group_name}' is not executed because its dependencies failed: {', '.join(sorted(str(dependency) for dependency in failed_dependencies))}."
+                        )
+                    elif dependencies <= exit_codes.keys():
+                        del pending_groups[group_name]
+                        running[pool.submit(self._run_group, group_name, execute_step)] = group_name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    exit_codes[running.pop(future)] = future.result()
+        return exit_codes
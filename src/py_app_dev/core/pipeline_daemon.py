@@ -0,0 +1,218 @@
+"""
+Long-lived process executing pipeline invocations forwarded by a thin client over a Unix socket.
+
+Starting the interpreter, importing the dependencies and the step modules and loading the pipeline configuration
+often takes longer than an incremental run. The daemon pays these costs once: the ``execute`` callable keeps
+its state (e.g. a PipelineLoader, whose user step modules are only reloaded when their files change, and an
+Executor with its file hash cache) between the invocations.
+
+The protocol uses one JSON object per line. The client sends ``{"args": [...], "cwd": "..."}`` or ``{"command": "stop"}``,
+the daemon answers with any number of ``{"log": "..."}`` messages followed by ``{"exit_code": ...}``.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import threading
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .exceptions import UserNotificationException
+from .logging import logger
+
+if TYPE_CHECKING:
+    from loguru import Message
+
+
+def _send(connection: socket.socket, message: dict[str, Any]) -> None:
+    connection.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+@contextmanager
+def _working_directory(directory: str | None) -> Generator[None, None, None]:
+    previous_directory = os.getcwd()
+    if directory:
+        os.chdir(directory)
+    try:
+        yield
+    finally:
+        os.chdir(previous_directory)
+
+
+class PipelineDaemon:
+    """
+    Serves the pipeline invocations of PipelineDaemonClient instances.
+
+    The invocations are executed one after the other, in the working directory of the client.
+    All log messages emitted during an invocation are forwarded to its client.
+
+    Args:
+    ----
+        socket_path: Unix socket to listen on. A stale socket file of a daemon which is not running anymore is replaced.
+        execute: executes one invocation with the command line arguments of the client and returns the exit code
+        log_level: minimum level of the log messages forwarded to the client
+
+    """
+
+    def __init__(self, socket_path: Path, execute: Callable[[list[str]], int], log_level: str | int = "INFO") -> None:
+        self.socket_path = socket_path
+        self.execute = execute
+        self.log_level = log_level
+        self._server: socketserver.UnixStreamServer | None = None
+
+    def serve_forever(self) -> None:
+        """Listen on the socket until a client sends the stop command or shutdown() is called."""
+        if PipelineDaemonClient(self.socket_path).is_running():
+            raise UserNotificationException(f"A pipeline daemon is already running on '{self.socket_path}'.")
+        self.socket_path.unlink(missing_ok=True)
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        daemon = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                line = self.rfile.readline()
+                # Clients checking whether the daemon is running connect without sending a request
+                if line:
+                    daemon._handle(self.request, json.loads(line))
+
+        with self._create_server(RequestHandler) as server:
+            self._server = server
+            logger.info(f"Pipeline daemon listening on '{self.socket_path}'.")
+            try:
+                server.serve_forever()
+            finally:
+                self._server = None
+                self.socket_path.unlink(missing_ok=True)
+
+    # Quoted: the server class does not exist on platforms without Unix sockets, this module shall still be importable there
+    def _create_server(self, request_handler: type[socketserver.BaseRequestHandler]) -> "socketserver.UnixStreamServer":
+        """
+        Create the server listening on the socket, which only the owner of the daemon can connect to.
+
+        The clients run invocations with arbitrary arguments as the owner of the daemon.
+        The socket is created in a private directory and only moved into place once its permissions are restricted.
+        """
+        with tempfile.TemporaryDirectory(dir=self.socket_path.parent, prefix=".pipeline_daemon_") as private_dir:
+            private_socket_path = Path(private_dir) / "socket"
+            server = socketserver.UnixStreamServer(str(private_socket_path), request_handler)
+            try:
+                os.chmod(private_socket_path, stat.S_IRUSR | stat.S_IWUSR)
+                os.replace(private_socket_path, self.socket_path)
+            except BaseException:
+                server.server_close()
+                raise
+        server.server_address = str(self.socket_path)
+        return server
+
+    def shutdown(self) -> None:
+        """Stop serving. Must not be called from the thread running serve_forever()."""
+        if self._server is not None:
+            self._server.shutdown()
+
+    def _handle(self, connection: socket.socket, request: dict[str, Any]) -> None:
+        if request.get("command") == "stop":
+            logger.info("Pipeline daemon stopped by client.")
+            # shutdown() waits for serve_forever() to return, which is running this handler
+            threading.Thread(target=self.shutdown).start()
+            _send(connection, {"exit_code": 0})
+            return
+        client_connected = True
+
+        def forward(message: "Message") -> None:
+            nonlocal client_connected
+            if client_connected:
+                try:
+                    _send(connection, {"log": str(message).rstrip("\n")})
+                except OSError:
+                    # The client is gone, but the invocation shall still complete
+                    client_connected = False
+
+        sink_id = logger.add(forward, format="{level: <8} | {message}", level=self.log_level)
+        try:
+            with _working_directory(request.get("cwd")):
+                exit_code = self.execute(list(request.get("args", [])))
+        except UserNotificationException as e:
+            logger.error(e)
+            exit_code = 1
+        except SystemExit as e:
+            # e.g. argparse exits for --help or invalid arguments, which shall not stop the daemon
+            exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            if isinstance(e.code, str):
+                logger.error(e.code)
+        except Exception:
+            logger.exception("Pipeline invocation failed.")
+            exit_code = 1
+        finally:
+            logger.remove(sink_id)
+        if client_connected:
+            try:
+                _send(connection, {"exit_code": exit_code})
+            except OSError:
+                pass
+
+
+class PipelineDaemonClient:
+    """
+    Forwards pipeline invocations to a PipelineDaemon and reports its log messages and exit code.
+
+    Args:
+    ----
+        socket_path: Unix socket the daemon listens on
+        on_log: called with every log message of the daemon. Defaults to printing it to stdout.
+
+    """
+
+    def __init__(self, socket_path: Path, on_log: Callable[[str], None] | None = None) -> None:
+        self.socket_path = socket_path
+        self.on_log = on_log or self._print_log
+
+    @staticmethod
+    def _print_log(message: str) -> None:
+        sys.stdout.write(message + "\n")
+        sys.stdout.flush()
+
+    def _connect(self) -> socket.socket:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            connection.connect(str(self.socket_path))
+        except OSError:
+            connection.close()
+            raise
+        return connection
+
+    def is_running(self) -> bool:
+        """Check whether a daemon accepts connections on the socket."""
+        try:
+            self._connect().close()
+        except OSError:
+            return False
+        return True
+
+    def _send_request(self, request: dict[str, Any]) -> int:
+        try:
+            connection = self._connect()
+        except OSError as e:
+            raise UserNotificationException(f"No pipeline daemon is running on '{self.socket_path}': {e}") from None
+        with connection, connection.makefile("rb") as responses:
+            _send(connection, request)
+            for line in responses:
+                response = json.loads(line)
+                if "log" in response:
+                    self.on_log(response["log"])
+                elif "exit_code" in response:
+                    return int(response["exit_code"])
+        raise UserNotificationException("The pipeline daemon closed the connection without reporting an exit code.")
+
+    def run(self, args: list[str]) -> int:
+        """Execute an invocation with the given command line arguments in the current working directory."""
+        return self._send_request({"args": args, "cwd": os.getcwd()})
+
+    def stop(self) -> None:
+        """Stop the daemon after its current invocation."""
+        self._send_request({"command": "stop"})
@@ -0,0 +1,72 @@
+import multiprocessing
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from .logging import logger
+
+if TYPE_CHECKING:
+    from loguru import Message, Record
+
+_T = TypeVar("_T")
+
+#: Fields of the log records sent from the worker processes: level, message, logger name, function, line
+_LogRecord = tuple[str, str, str | None, str, int]
+
+
+def _initialize_worker(log_queue: "multiprocessing.Queue[_LogRecord | None]") -> None:
+    def forward(message: "Message") -> None:
+        record = message.record
+        log_queue.put((record["level"].name, str(message).rstrip("\n"), record["name"], record["function"], record["line"]))
+
+    # The sinks of the parent process (inherited when forking) must not be used by the workers
+    logger.remove()
+    logger.add(forward, format="{message}", level=0)
+
+
+class LogForwardingProcessPool:
+    """
+    Pool of worker processes which forward their log messages to the loguru sinks of the parent process.
+
+    The workers are reused for all submitted calls, such that modules imported by a call are already loaded for the next ones.
+
+    Args:
+    ----
+        max_workers: number of worker processes. Defaults to the number of CPUs.
+
+    """
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        self._log_queue: multiprocessing.Queue[_LogRecord | None] = multiprocessing.Queue()
+        self._pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_initialize_worker, initargs=(self._log_queue,))
+        self._log_forwarder = threading.Thread(target=self._forward_logs, name="log_forwarder", daemon=True)
+        self._log_forwarder.start()
+
+    def _forward_logs(self) -> None:
+        while (log_record := self._log_queue.get()) is not None:
+            level, message, name, function, line = log_record
+
+            # Report the origin of the message in the worker instead of this function
+            def set_origin(record: "Record", name: str | None = name, function: str = function, line: int = line) -> None:
+                record["name"] = name
+                record["function"] = function
+                record["line"] = line
+
+            logger.patch(set_origin).log(level, message)
+
+    def submit(self, function: Callable[..., _T], *args: Any) -> "Future[_T]":
+        return self._pool.submit(function, *args)
+
+    def shutdown(self) -> None:
+        """Stop the workers and wait until all their log messages are forwarded."""
+        self._pool.shutdown(wait=True)
+        self._log_queue.put(None)
+        self._log_forwarder.join()
+        self._log_queue.close()
+
+    def __enter__(self) -> "LogForwardingProcessPool":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.shutdown()
@@ -0,0 +1,202 @@
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, TypeAlias
+
+from .atomic_file import write_text_atomically
+
+RunInfo: TypeAlias = dict[str, Any]
+
+
+class RunInfoBackend(ABC):
+    """Storage for the execution information of the runnables, by runnable id."""
+
+    @abstractmethod
+    def load(self, runnable_id: str) -> RunInfo | None:
+        """Get the stored run info or None if there is no run info for this runnable."""
+
+    @abstractmethod
+    def store(self, runnable_id: str, run_info: RunInfo) -> None:
+        """Store the run info. It might only be persisted when flushed."""
+
+    def flush(self) -> None:
+        """Persist all stored run info."""
+        return None
+
+    def close(self) -> None:
+        """Persist all stored run info and release the resources. The backend can still be used afterwards."""
+        self.flush()
+
+
+class JsonFilesRunInfoBackend(RunInfoBackend):
+    """Stores the run info of every runnable in its own JSON file."""
+
+    FILE_EXTENSION = ".deps.json"
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = cache_dir
+
+    def get_file(self, runnable_id: str) -> Path:
+        return self.cache_dir / f"{runnable_id}{self.FILE_EXTENSION}"
+
+    def load(self, runnable_id: str) -> RunInfo | None:
+        run_info_path = self.get_file(runnable_id)
+        if not run_info_path.exists():
+            return None
+        with run_info_path.open() as f:
+            run_info: RunInfo = json.load(f)
+        return run_info
+
+    def store(self, runnable_id: str, run_info: RunInfo) -> None:
+        run_info_path = self.get_file(runnable_id)
+        run_info_path.parent.mkdir(parents=True, exist_ok=True)
+        with run_info_path.open("w") as f:
+            # pretty print the json file
+            json.dump(run_info, f, indent=4)
+
+
+class JsonIndexRunInfoBackend(RunInfoBackend):
+    """
+    Keeps the run info of all runnables in an in-memory index persisted in one compact JSON file.
+
+    The index file is read once on first access. Stored run info is kept dirty in memory and written in one pass when flushed,
+    or periodically if a flush interval is given. When flushing, the index file is read again such that entries
+    written by other executors in the meantime are preserved. The file is replaced atomically.
+
+    Args:
+    ----
+        index_file: JSON file with the run info by runnable id
+        flush_interval_sec: if set, the dirty run info is also flushed when storing and the last flush is older than this
+
+    """
+
+    DEFAULT_INDEX_FILE = "run_info_index.json"
+
+    def __init__(self, index_file: Path, flush_interval_sec: float | None = None) -> None:
+        self.index_file = index_file
+        self.flush_interval_sec = flush_interval_sec
+        self._index: dict[str, RunInfo] | None = None
+        self._dirty: dict[str, RunInfo] = {}
+        self._last_flush_time = time.monotonic()
+        self._lock = threading.RLock()
+
+    def _read_index_file(self) -> dict[str, RunInfo]:
+        try:
+            index: dict[str, RunInfo] = json.loads(self.index_file.read_text())
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            # The index can always be rebuilt, all runnables will run again
+            return {}
+        return index
+
+    def _get_index(self) -> dict[str, RunInfo]:
+        if self._index is None:
+            self._index = self._read_index_file()
+        return self._index
+
+    def load(self, runnable_id: str) -> RunInfo | None:
+        with self._lock:
+            return self._get_index().get(runnable_id)
+
+    def store(self, runnable_id: str, run_info: RunInfo) -> None:
+        with self._lock:
+            self._get_index()[runnable_id] = run_info
+            self._dirty[runnable_id] = run_info
+            if self.flush_interval_sec is not None and time.monotonic() - self._last_flush_time >= self.flush_interval_sec:
+                self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._last_flush_time = time.monotonic()
+            if not self._dirty:
+                return
+            index = self._read_index_file()
+            index.update(self._dirty)
+            write_text_atomically(self.index_file, json.dumps(index, separators=(",", ":")))
+            self._index = index
+            self._dirty.clear()
+
+
+class MemoryCachedRunInfoBackend(RunInfoBackend):
+    """Keeps the run info loaded from or stored to another backend in memory, such that it is read only once."""
+
+    def __init__(self, backend: RunInfoBackend) -> None:
+        self.backend = backend
+        self._run_infos: dict[str, RunInfo | None] = {}
+        self._lock = threading.Lock()
+
+    def load(self, runnable_id: str) -> RunInfo | None:
+        with self._lock:
+            if runnable_id in self._run_infos:
+                return self._run_infos[runnable_id]
+        run_info = self.backend.load(runnable_id)
+        with self._lock:
+            return self._run_infos.setdefault(runnable_id, run_info)
+
+    def store(self, runnable_id: str, run_info: RunInfo) -> None:
+        self.backend.store(runnable_id, run_info)
+        with self._lock:
+            self._run_infos[runnable_id] = run_info
+
+    def flush(self) -> None:
+        self.backend.flush()
+
+    def close(self) -> None:
+        self.backend.close()
+
+
+class SqliteRunInfoBackend(RunInfoBackend):
+    """
+    Stores the run info of all runnables in one SQLite database indexed by the runnable id.
+
+    Stored run info is kept in memory and written in a single transaction when flushed.
+    """
+
+    DEFAULT_DATABASE_FILE = "run_info.sqlite"
+
+    def __init__(self, database_file: Path) -> None:
+        self.database_file = database_file
+        self._pending: dict[str, RunInfo] = {}
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.database_file.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.database_file, check_same_thread=False)
+            self._connection.execute("CREATE TABLE IF NOT EXISTS run_info (runnable_id TEXT PRIMARY KEY, data TEXT NOT NULL)")
+        return self._connection
+
+    def load(self, runnable_id: str) -> RunInfo | None:
+        with self._lock:
+            if runnable_id in self._pending:
+                return self._pending[runnable_id]
+            row = self._get_connection().execute("SELECT data FROM run_info WHERE runnable_id = ?", (runnable_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def store(self, runnable_id: str, run_info: RunInfo) -> None:
+        with self._lock:
+            self._pending[runnable_id] = run_info
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._pending:
+                return
+            connection = self._get_connection()
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO run_info (runnable_id, data) VALUES (?, ?)",
+                    [(runnable_id, json.dumps(run_info, separators=(",", ":"))) for runnable_id, run_info in self._pending.items()],
+                )
+            self._pending.clear()
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
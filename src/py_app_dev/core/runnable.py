@@ -1,16 +1,40 @@
 # create a Runnable protocol and make Executor accept it
 import hashlib
 import json
+import os
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from enum import Enum
+from functools import partial
 from pathlib import Path
-
+from typing import NamedTuple, TypeVar
+
+from .artifact_cache import ArtifactCache
+from .depfile import read_depfile
+from .exceptions import UserNotificationException
+from .execution_metrics import ExecutionMetricsCollector, RunDurationHistory, RunnableMetrics
+from .file_listing import DirectoryListingCache, get_glob_base, glob_matches
+from .file_watcher import FileWatcher, create_file_watcher
+from .hashing import DirectoryHasher, FileHashCache, FileHasher, FileStat
 from .logging import logger
+from .process_pool import LogForwardingProcessPool
+from .run_info import JsonFilesRunInfoBackend, JsonIndexRunInfoBackend, MemoryCachedRunInfoBackend, RunInfo, RunInfoBackend
+from .watchdog import run_with_timeout
+
+_TExecutor = TypeVar("_TExecutor", bound="Executor")
 
 
 class Runnable(ABC):
-    def __init__(self, needs_dependency_management: bool = True) -> None:
+    def __init__(self, needs_dependency_management: bool = True, timeout_sec: float | None = None, cpu_bound: bool = False) -> None:
         self.needs_dependency_management = needs_dependency_management
+        #: If set, the runnable is executed in a separate process which is terminated together with its children after the timeout
+        self.timeout_sec = timeout_sec
+        #: If set, run() is executed in a worker process of the executor process pool (if enabled). The runnable must be picklable.
+        self.cpu_bound = cpu_bound
 
     @abstractmethod
     def run(self) -> int:
@@ -40,6 +64,30 @@ class Runnable(ABC):
         """
         return None
 
+    def get_input_globs(self) -> list[str]:
+        """
+        Get glob patterns of additional inputs, e.g. ``src/**/*.c``.
+
+        The matching files are tracked like the inputs from get_inputs(). Files added or removed change the inputs.
+        """
+        return []
+
+    def get_depfile(self) -> Path | None:
+        """
+        Get the makefile-syntax depfile written by run(), e.g. by a compiler called with ``-MD``.
+
+        The dependencies listed in the depfile are tracked like inputs, in addition to get_inputs().
+        """
+        return None
+
+    def get_resources(self) -> dict[str, int]:
+        """
+        Get the resources required while running, e.g. ``{"mem_gb": 8}`` or ``{"linker": 1}``.
+
+        Runnables are only started in parallel as long as their requirements fit into the resource limits of the executor.
+        """
+        return {}
+
 
 class RunInfoStatus(Enum):
     MATCH = (False, "Nothing changed. Previous execution info matches.")
@@ -50,34 +98,341 @@ class RunInfoStatus(Enum):
     NOTHING_TO_CHECK = (True, "Nothing to be checked. Assume it shall always run.")
     FORCED_RUN = (True, "Forced run. Ignore previous execution info.")
     CONFIG_CHANGED = (True, "Configuration has changed.")
+    HASH_ALGORITHM_CHANGED = (True, "Hash algorithm has changed.")
+    TIMED_OUT = (True, "Previous execution timed out.")
 
     def __init__(self, should_run: bool, message: str) -> None:
         self.should_run = should_run
         self.message = message
 
 
+@dataclass
+class ExecutionResult:
+    #: Exit code of the runnable. Zero if the runnable was skipped.
+    exit_code: int
+    #: Result of the up-to-date check. None if the runnable does not need dependency management.
+    run_info_status: RunInfoStatus | None = None
+    #: False if the runnable was skipped or its outputs are identical to the previous execution
+    outputs_changed: bool = True
+
+
+class _RunnableTimeoutError(Exception):
+    """Raised when the executor terminated a runnable which exceeded its timeout."""
+
+
+@dataclass
+class _RunInfoCheck:
+    status: RunInfoStatus
+    previous_info: RunInfo | None = None
+    stale_stats: dict[str, FileStat] = field(default_factory=dict)
+
+
+class _PathState(NamedTuple):
+    #: Stat of the path if it is a regular file
+    file_stat: FileStat | None
+    exists: bool
+
+
+class _PathStates:
+    """Stats and hashes of paths, determined at most once and shared by the checks of several runnables."""
+
+    def __init__(self, hash_provider: Callable[[Path, FileStat | None], str | None]) -> None:
+        self._hash_provider = hash_provider
+        self._states: dict[str, _PathState] = {}
+        self._hashes: dict[str, str | None] = {}
+
+    @staticmethod
+    def _determine_state(path_str: str) -> _PathState:
+        path = Path(path_str)
+        file_stat = FileStat.from_path(path)
+        return _PathState(file_stat, file_stat is not None or path.exists())
+
+    def get_state(self, path_str: str) -> _PathState:
+        if path_str not in self._states:
+            self._states[path_str] = self._determine_state(path_str)
+        return self._states[path_str]
+
+    def get_hash(self, path_str: str) -> str | None:
+        if path_str not in self._hashes:
+            self._hashes[path_str] = self._hash_provider(Path(path_str), self.get_state(path_str).file_stat)
+        return self._hashes[path_str]
+
+    def prefetch_states(self, path_strs: Iterable[str], pool: ThreadPoolExecutor) -> None:
+        missing = [path_str for path_str in path_strs if path_str not in self._states]
+        self._states.update(zip(missing, pool.map(self._determine_state, missing), strict=True))
+
+    def prefetch_hashes(self, path_strs: Iterable[str], pool: ThreadPoolExecutor) -> None:
+        missing = [path_str for path_str in path_strs if path_str not in self._hashes]
+        hashes = pool.map(lambda path_str: self._hash_provider(Path(path_str), self.get_state(path_str).file_stat), missing)
+        self._hashes.update(zip(missing, hashes, strict=True))
+
+
+class ResourcePool:
+    """
+    Slots of named resources shared by the runnables executed in parallel.
+
+    Resources without a limit are unlimited. A requirement larger than the limit is reduced to the limit,
+    such that the runnable can still run, but only alone.
+    """
+
+    def __init__(self, limits: dict[str, int]) -> None:
+        self.limits = limits
+        self._used = dict.fromkeys(limits, 0)
+
+    def _get_requirements(self, runnable: Runnable) -> dict[str, int]:
+        return {name: min(amount, self.limits[name]) for name, amount in runnable.get_resources().items() if name in self.limits}
+
+    def fits(self, runnable: Runnable) -> bool:
+        return all(self._used[name] + amount <= self.limits[name] for name, amount in self._get_requirements(runnable).items())
+
+    def acquire(self, runnable: Runnable) -> None:
+        for name, amount in self._get_requirements(runnable).items():
+            self._used[name] += amount
+
+    def release(self, runnable: Runnable) -> None:
+        for name, amount in self._get_requirements(runnable).items():
+            self._used[name] -= amount
+
+
+class RunnableGraph:
+    """
+    Dependency graph of runnables.
+
+    A runnable depends on another one if one of its inputs is an output of the other one
+    or is located inside an output directory of the other one.
+    """
+
+    def __init__(self, runnables: Sequence[Runnable]) -> None:
+        self.runnables: dict[str, Runnable] = {}
+        for runnable in runnables:
+            runnable_id = runnable.get_id()
+            if runnable_id in self.runnables:
+                raise UserNotificationException(f"Runnable id '{runnable_id}' is not unique. Make sure every runnable returns a unique get_id().")
+            self.runnables[runnable_id] = runnable
+        self._positions = {runnable_id: position for position, runnable_id in enumerate(self.runnables)}
+        self._dependencies: dict[str, set[str]] = {runnable_id: set() for runnable_id in self.runnables}
+        self._dependents: dict[str, set[str]] = {runnable_id: set() for runnable_id in self.runnables}
+        self._build()
+
+    @staticmethod
+    def _normalize(path: Path) -> Path:
+        return Path(os.path.abspath(path))
+
+    def _build(self) -> None:
+        producers: dict[Path, str] = {}
+        for runnable_id, runnable in self.runnables.items():
+            for output in runnable.get_outputs():
+                producers[self._normalize(output)] = runnable_id
+        for runnable_id, runnable in self.runnables.items():
+            producer_ids: set[str] = set()
+            for input_path in [*runnable.get_inputs(), *map(get_glob_base, runnable.get_input_globs())]:
+                normalized_input = self._normalize(input_path)
+                producer_ids.update(producers[candidate] for candidate in (normalized_input, *normalized_input.parents) if candidate in producers)
+            for pattern in runnable.get_input_globs():
+                producer_ids.update(producer_id for output, producer_id in producers.items() if glob_matches(pattern, output))
+            producer_ids.discard(runnable_id)
+            for producer_id in producer_ids:
+                self._dependencies[runnable_id].add(producer_id)
+                self._dependents[producer_id].add(runnable_id)
+        self._check_for_cycles()
+
+    def _check_for_cycles(self) -> None:
+        # Kahn's algorithm: if not all nodes can be sorted, there is a cycle
+        if len(self.get_topological_order()) != len(self.runnables):
+            raise UserNotificationException("Runnables have circular dependencies between their inputs and outputs.")
+
+    def get_dependencies(self, runnable_id: str) -> set[str]:
+        """Get the ids of the runnables which produce inputs for the given runnable."""
+        return self._dependencies[runnable_id]
+
+    def get_dependents(self, runnable_id: str) -> list[str]:
+        """Get the ids of the runnables which consume outputs of the given runnable, in declaration order."""
+        return sorted(self._dependents[runnable_id], key=self._positions.__getitem__)
+
+    def get_affected(self, changed_paths: Iterable[Path]) -> list[str]:
+        """
+        Get the runnables affected by changed files, in topological order.
+
+        A runnable is affected if one of its inputs changed, is located in a changed directory or contains a changed file.
+        The same applies to files matching its input glob patterns.
+        All dependents of an affected runnable are affected too.
+        """
+        normalized_changed_paths = {self._normalize(path) for path in changed_paths}
+        affected: set[str] = set()
+        for runnable_id, runnable in self.runnables.items():
+            if any(self._is_input_affected(runnable, path) for path in normalized_changed_paths):
+                affected.add(runnable_id)
+        pending = list(affected)
+        while pending:
+            for dependent_id in self._dependents[pending.pop()]:
+                if dependent_id not in affected:
+                    affected.add(dependent_id)
+                    pending.append(dependent_id)
+        return [runnable_id for runnable_id in self.get_topological_order() if runnable_id in affected]
+
+    def _is_input_affected(self, runnable: Runnable, changed_path: Path) -> bool:
+        for input_path in map(self._normalize, runnable.get_inputs()):
+            if input_path == changed_path or changed_path in input_path.parents or input_path in changed_path.parents:
+                return True
+        for pattern in runnable.get_input_globs():
+            glob_base = self._normalize(get_glob_base(pattern))
+            if glob_matches(pattern, changed_path) or changed_path == glob_base or changed_path in glob_base.parents:
+                return True
+        return False
+
+    def get_watched_paths(self) -> list[Path]:
+        """Get the normalized inputs and input glob base directories which are not produced by any of the runnables."""
+        produced_paths = self.get_outputs()
+        watched_paths = set()
+        for runnable in self.runnables.values():
+            for path in map(self._normalize, [*runnable.get_inputs(), *map(get_glob_base, runnable.get_input_globs())]):
+                if path not in produced_paths:
+                    watched_paths.add(path)
+        return sorted(watched_paths)
+
+    def get_outputs(self) -> set[Path]:
+        """Get the normalized outputs of all runnables."""
+        return {self._normalize(output) for runnable in self.runnables.values() for output in runnable.get_outputs()}
+
+    def get_critical_path_lengths(self, durations: dict[str, float], default_duration: float) -> dict[str, float]:
+        """
+        Get for every runnable the duration of the longest chain of runnables starting with it.
+
+        Args:
+        ----
+            durations: expected duration of the runnables by id
+            default_duration: duration of the runnables without expected duration
+
+        """
+        lengths: dict[str, float] = {}
+        for runnable_id in reversed(self.get_topological_order()):
+            dependents_length = max((lengths[dependent_id] for dependent_id in self._dependents[runnable_id]), default=0.0)
+            lengths[runnable_id] = durations.get(runnable_id, default_duration) + dependents_length
+        return lengths
+
+    def get_topological_order(self) -> list[str]:
+        """Get the runnable ids ordered such that every runnable comes after its dependencies."""
+        pending_dependencies = {runnable_id: len(dependencies) for runnable_id, dependencies in self._dependencies.items()}
+        ready = [runnable_id for runnable_id, count in pending_dependencies.items() if count == 0]
+        order: list[str] = []
+        while ready:
+            runnable_id = ready.pop(0)
+            order.append(runnable_id)
+            for dependent_id in self.get_dependents(runnable_id):
+                pending_dependencies[dependent_id] -= 1
+                if pending_dependencies[dependent_id] == 0:
+                    ready.append(dependent_id)
+        return order
+
+
 class Executor:
     """
     Accepts Runnable objects and executes them.
 
-    It create a file with the same name as the runnable's name and stores the inputs and outputs with their hashes.
+    It stores the inputs and outputs with their hashes for every runnable id (by default in a file named after the id).
     If the file exists, it checks the hashes of the inputs and outputs and if they match, it skips the execution.
-    """
 
-    RUN_INFO_FILE_EXTENSION = ".deps.json"
+    (!) Some state is kept in memory and only persisted when flushed: the run info of the index and SQLite backends,
+    the persisted file hashes and the run durations. execute_all() flushes it once when done, execute() does not, such that
+    executing many runnables one by one does not rewrite these files every time. Use the executor as context manager
+    (or call close()) to persist the state and release the resources, otherwise the run info might be lost.
+
+    Args:
+    ----
+        cache_dir: directory where the execution information is stored
+        force_run: if True, the runnables are executed even if nothing changed
+        dry_run: if True, the runnables are only checked but not executed
+        hash_algorithm: hashlib algorithm used for the file hashes
+        hash_cache_size: maximum number of file hashes kept in memory
+        persist_hash_cache: if True, the file hashes are stored in the cache directory when flushed and reused by other executors
+        hash_directories: if True, directories are tracked with a digest over their content instead of only their existence.
+            The file hashes are then persisted like with persist_hash_cache, such that other executors only hash the changed files.
+        directory_include_patterns: glob patterns of the files to be considered for the directory digests
+        directory_exclude_patterns: glob patterns of the files and directories to be ignored for the directory digests
+        run_info_backend: storage of the run info. Defaults to one JSON file per runnable in the cache directory.
+        artifact_cache: optional cache to restore the outputs of a runnable instead of running it
+        index_run_info: if True and no run info backend is given, the run info of all runnables is loaded once into memory
+            and written back to one index file in the cache directory when flushed
+        resource_limits: available amount of every named resource, e.g. ``{"mem_gb": 32}``. See Runnable.get_resources().
+        process_pool_workers: if set, the cpu bound runnables are executed in a pool with this number of worker processes.
+            The pool is reused until the executor is closed. The up-to-date checks and the run info stay in this process.
+
+    """
 
-    def __init__(self, cache_dir: Path, force_run: bool = False, dry_run: bool = False) -> None:
+    RUN_INFO_FILE_EXTENSION = JsonFilesRunInfoBackend.FILE_EXTENSION
+    #: Run info sections with the hashes of the tracked files. The discovered inputs are read from the runnable depfile.
+    TRACKED_FILE_TYPES = ("inputs", "discovered_inputs", "outputs")
+    HASH_CACHE_FILE = "file_hashes.json"
+    RUN_DURATIONS_FILE = "run_durations.json"
+    #: Expected run() duration of runnables which never ran, if no other runnable ran before either
+    DEFAULT_RUN_DURATION_SEC = 1.0
+    #: Exit code of runnables terminated because of their timeout (same as the GNU timeout command)
+    TIMEOUT_EXIT_CODE = 124
+    #: Maximum time the watch mode takes to notice that it shall stop
+    WATCH_STOP_CHECK_INTERVAL_SEC = 0.2
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        force_run: bool = False,
+        dry_run: bool = False,
+        hash_algorithm: str = FileHasher.DEFAULT_ALGORITHM,
+        hash_cache_size: int = FileHashCache.DEFAULT_MAX_ENTRIES,
+        persist_hash_cache: bool = False,
+        hash_directories: bool = False,
+        directory_include_patterns: list[str] | None = None,
+        directory_exclude_patterns: list[str] | None = None,
+        run_info_backend: RunInfoBackend | None = None,
+        artifact_cache: ArtifactCache | None = None,
+        index_run_info: bool = False,
+        resource_limits: dict[str, int] | None = None,
+        process_pool_workers: int | None = None,
+    ) -> None:
         self.cache_dir = cache_dir
         self.force_run = force_run
         self.dry_run = dry_run
+        if run_info_backend is None:
+            run_info_backend = JsonIndexRunInfoBackend(cache_dir / JsonIndexRunInfoBackend.DEFAULT_INDEX_FILE) if index_run_info else JsonFilesRunInfoBackend(cache_dir)
+        self.run_info_backend = run_info_backend
+        self.artifact_cache = artifact_cache
+        self.directory_listing = DirectoryListingCache()
+        self.resource_limits = resource_limits or {}
+        self.process_pool_workers = process_pool_workers
+        self._process_pool: LogForwardingProcessPool | None = None
+        self._process_pool_lock = threading.Lock()
+        self.run_durations = RunDurationHistory(cache_dir / self.RUN_DURATIONS_FILE)
+        self.metrics = ExecutionMetricsCollector(self.run_durations)
+        self.file_hasher = FileHasher(hash_algorithm)
+        # The directory digests are only kept in memory. Without the persisted file hashes every new executor would hash all files of the directories.
+        self.hash_cache = FileHashCache(hash_algorithm, hash_cache_size, cache_dir / self.HASH_CACHE_FILE if persist_hash_cache or hash_directories else None)
+        # Directories are hashed only on request. Otherwise their content is not tracked and "IS_DIR" is stored instead.
+        self.directory_hasher = DirectoryHasher(self._get_hash, hash_algorithm, directory_include_patterns, directory_exclude_patterns) if hash_directories else None
+
+    def __enter__(self: _TExecutor) -> _TExecutor:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Persist the state kept in memory, close the run info backend and stop the worker processes. Called automatically when used as context manager."""
+        self.flush()
+        self.run_info_backend.close()
+        with self._process_pool_lock:
+            if self._process_pool is not None:
+                self._process_pool.shutdown()
+                self._process_pool = None
+
+    def flush(self) -> None:
+        """Persist the state kept in memory. Called automatically by close() and after execute_all()."""
+        self.run_info_backend.flush()
+        self.hash_cache.save()
+        self.run_durations.save()
 
     @staticmethod
-    def get_file_hash(path: Path) -> str | None:
+    def get_file_hash(path: Path, file_hasher: FileHasher | None = None) -> str | None:
         if path.is_file():
-            with open(path, "rb") as file:
-                bytes = file.read()
-                readable_hash = hashlib.sha256(bytes).hexdigest()
-                return readable_hash
+            return (file_hasher or FileHasher()).hash_file(path)
         # Return special string for directories instead of hashing the whole directory
         elif path.is_dir():
             return "IS_DIR"
@@ -85,41 +440,129 @@ class Executor:
         else:
             return None
 
-    def store_run_info(self, runnable: Runnable) -> None:
-        def file_hash_to_str(file_hash: str | None) -> str:
-            if file_hash is None:
-                return "NOT_FOUND"
-            else:
-                return file_hash
-
-        file_info = {
-            "inputs": {str(path): file_hash_to_str(self.get_file_hash(path)) for path in runnable.get_inputs()},
-            "outputs": {str(path): file_hash_to_str(self.get_file_hash(path)) for path in runnable.get_outputs()},
-        }
+    def _get_inputs(self, runnable: Runnable) -> list[Path]:
+        """Get the declared inputs and the files matching the input glob patterns."""
+        inputs = {str(path): path for path in runnable.get_inputs()}
+        for pattern in runnable.get_input_globs():
+            inputs.update((str(path), path) for path in self.directory_listing.glob(pattern) if str(path) not in inputs)
+        return list(inputs.values())
+
+    def _get_discovered_inputs(self, runnable: Runnable) -> list[Path]:
+        depfile = runnable.get_depfile()
+        if depfile is None:
+            return []
+        inputs = {str(path) for path in self._get_inputs(runnable)}
+        return [path for path in read_depfile(depfile) if str(path) not in inputs]
+
+    def store_run_info(self, runnable: Runnable, runnable_metrics: RunnableMetrics | None = None) -> RunInfo:
+        file_info: RunInfo = {"hash_algorithm": self.file_hasher.algorithm}
+        file_stats: dict[str, FileStat] = {}
+        tracked_paths = [("inputs", self._get_inputs(runnable)), ("outputs", runnable.get_outputs())]
+        if runnable.get_depfile() is not None:
+            tracked_paths.append(("discovered_inputs", self._get_discovered_inputs(runnable)))
+        for file_type, paths in tracked_paths:
+            file_info[file_type] = {}
+            for path in paths:
+                file_stat = FileStat.from_path(path)
+                # The stat is taken before hashing. A file modified while hashing will be rehashed on the next check.
+                if file_stat is not None:
+                    file_stats[str(path)] = file_stat
+                file_hash = self._get_hash(path, file_stat)
+                file_info[file_type][str(path)] = "NOT_FOUND" if file_hash is None else file_hash
+        file_info["file_stats"] = file_stats
 
         # Only store config if the runnable has a config
         config = runnable.get_config()
         if config is not None:
             file_info["config"] = config
 
-        run_info_path = self.get_runnable_run_info_file(runnable)
-        run_info_path.parent.mkdir(parents=True, exist_ok=True)
-        with run_info_path.open("w") as f:
-            # pretty print the json file
-            json.dump(file_info, f, indent=4)
+        if runnable_metrics is not None:
+            file_info["metrics"] = runnable_metrics.to_run_info()
+
+        self.run_info_backend.store(runnable.get_id(), file_info)
+        return file_info
+
+    @staticmethod
+    def _check_file(path_str: str, previous_hash: str, previous_stat: list[int] | None, stale_stats: dict[str, FileStat], path_states: _PathStates) -> RunInfoStatus:
+        """
+        Compare a file against its previous run info. The file is only hashed if its stat changed.
+
+        Files with the same content but a new stat (e.g. rewritten with identical content) are collected in stale_stats.
+        """
+        path_state = path_states.get_state(path_str)
+        if not path_state.exists:
+            return RunInfoStatus.FILE_NOT_FOUND
+        if previous_stat is not None and path_state.file_stat == FileStat(*previous_stat):
+            return RunInfoStatus.MATCH
+        if path_states.get_hash(path_str) != previous_hash:
+            return RunInfoStatus.FILE_CHANGED
+        if path_state.file_stat is not None:
+            stale_stats[path_str] = path_state.file_stat
+        return RunInfoStatus.MATCH
 
     def get_runnable_run_info_file(self, runnable: Runnable) -> Path:
-        return self.cache_dir / f"{runnable.get_id()}{self.RUN_INFO_FILE_EXTENSION}"
+        """Get the run info file used by the default JSON files backend."""
+        return JsonFilesRunInfoBackend(self.cache_dir).get_file(runnable.get_id())
 
     def previous_run_info_matches(self, runnable: Runnable) -> RunInfoStatus:
-        if self.force_run:
-            return RunInfoStatus.FORCED_RUN
-        run_info_path = self.get_runnable_run_info_file(runnable)
-        if not run_info_path.exists():
-            return RunInfoStatus.NO_INFO
+        self.directory_listing.clear()
+        return self._check_run_info(runnable).status
+
+    def check_many(self, runnables: Sequence[Runnable], max_workers: int | None = None) -> dict[str, RunInfoStatus]:
+        """
+        Check whether the runnables must run.
 
-        with run_info_path.open() as f:
-            previous_info = json.load(f)
+        All distinct paths of all runnables are stat'ed once and only the files with a changed stat are hashed, in parallel.
+        Every runnable is then checked against these shared results.
+
+        Returns
+        -------
+            The check result of every runnable, by runnable id.
+
+        """
+        if self.force_run:
+            return {runnable.get_id(): RunInfoStatus.FORCED_RUN for runnable in runnables}
+        self.directory_listing.clear()
+        previous_infos = {runnable.get_id(): self.run_info_backend.load(runnable.get_id()) for runnable in runnables}
+        recorded_stats: dict[str, set[tuple[int, ...] | None]] = {}
+        for previous_info in previous_infos.values():
+            if previous_info is None:
+                continue
+            previous_stats = previous_info.get("file_stats", {})
+            for file_type in self.TRACKED_FILE_TYPES:
+                for path_str in previous_info.get(file_type, {}):
+                    previous_stat = previous_stats.get(path_str)
+                    recorded_stats.setdefault(path_str, set()).add(tuple(previous_stat) if previous_stat is not None else None)
+
+        path_states = _PathStates(self._get_hash)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="check") as pool:
+            path_states.prefetch_states(recorded_stats, pool)
+            # Only files with a stat differing from one recorded in any run info need to be hashed
+            paths_to_hash = []
+            for path_str, stats in recorded_stats.items():
+                path_state = path_states.get_state(path_str)
+                if path_state.exists and any(previous_stat is None or FileStat(*previous_stat) != path_state.file_stat for previous_stat in stats):
+                    paths_to_hash.append(path_str)
+            path_states.prefetch_hashes(paths_to_hash, pool)
+        return {runnable.get_id(): self._check_run_info(runnable, previous_infos[runnable.get_id()], path_states).status for runnable in runnables}
+
+    def _check_run_info(self, runnable: Runnable, previous_info: RunInfo | None = None, path_states: _PathStates | None = None) -> _RunInfoCheck:
+        if self.force_run:
+            return _RunInfoCheck(RunInfoStatus.FORCED_RUN)
+        if previous_info is None:
+            previous_info = self.run_info_backend.load(runnable.get_id())
+        if previous_info is None:
+            return _RunInfoCheck(RunInfoStatus.NO_INFO)
+        if previous_info.get("timed_out"):
+            return _RunInfoCheck(RunInfoStatus.TIMED_OUT)
+        check = _RunInfoCheck(RunInfoStatus.MATCH, previous_info)
+        check.status = self._compare_run_info(runnable, previous_info, check.stale_stats, path_states or _PathStates(self._get_hash))
+        return check
+
+    def _compare_run_info(self, runnable: Runnable, previous_info: RunInfo, stale_stats: dict[str, FileStat], path_states: _PathStates) -> RunInfoStatus:
+        # Hashes calculated with another algorithm can not be compared. Run info without algorithm predates this field and used sha256.
+        if previous_info.get("hash_algorithm", FileHasher.DEFAULT_ALGORITHM) != self.file_hasher.algorithm:
+            return RunInfoStatus.HASH_ALGORITHM_CHANGED
 
         # Check if configuration has changed
         current_config = runnable.get_config()
@@ -128,40 +571,279 @@ class Executor:
                 return RunInfoStatus.CONFIG_CHANGED
 
         # Check if the list of inputs has changed
-        current_inputs = {str(path) for path in runnable.get_inputs()}
+        current_inputs = {str(path) for path in self._get_inputs(runnable)}
         previous_inputs = set(previous_info.get("inputs", {}).keys())
         if current_inputs != previous_inputs:
             return RunInfoStatus.INPUT_FILES_CHANGED
 
         # Check if there is anything to be checked
-        if any(len(previous_info[file_type]) for file_type in ["inputs", "outputs"]):
-            for file_type in ["inputs", "outputs"]:
-                for path_str, previous_hash in previous_info[file_type].items():
-                    path = Path(path_str)
-                    if not path.exists():
-                        return RunInfoStatus.FILE_NOT_FOUND
-                    elif self.get_file_hash(path) != previous_hash:
-                        return RunInfoStatus.FILE_CHANGED
+        if any(len(previous_info.get(file_type, {})) for file_type in self.TRACKED_FILE_TYPES):
+            previous_stats = previous_info.get("file_stats", {})
+            for file_type in self.TRACKED_FILE_TYPES:
+                for path_str, previous_hash in previous_info.get(file_type, {}).items():
+                    file_status = self._check_file(path_str, previous_hash, previous_stats.get(path_str), stale_stats, path_states)
+                    if file_status is not RunInfoStatus.MATCH:
+                        return file_status
         # If there is nothing to be checked, assume it shall always run
         else:
             return RunInfoStatus.NOTHING_TO_CHECK
         return RunInfoStatus.MATCH
 
+    def _get_hash(self, path: Path, file_stat: FileStat | None) -> str | None:
+        """Get the hash of a path. Regular files are hashed only once for the same stat."""
+        if file_stat is None:
+            if self.directory_hasher and path.is_dir():
+                return self.directory_hasher.hash_directory(path)
+            return self.get_file_hash(path, self.file_hasher)
+        file_hash = self.hash_cache.get(path, file_stat)
+        if file_hash is None:
+            start_time = time.perf_counter()
+            file_hash = self.get_file_hash(path, self.file_hasher)
+            self.metrics.record_hashing(file_stat.size, time.perf_counter() - start_time)
+            if file_hash is not None:
+                self.hash_cache.put(path, file_stat, file_hash)
+        return file_hash
+
+    def get_artifact_key(self, runnable: Runnable) -> str | None:
+        """
+        Get the key of the runnable outputs in the artifact cache.
+
+        The key is the hash of the runnable id, its configuration, the content of its inputs and the names of its outputs.
+        Returns None if the outputs can not be cached, i.e. there are no outputs or an input content is not known.
+        The inputs of runnables with a depfile are only known after running, so their outputs are not cached.
+        """
+        if not runnable.get_outputs() or runnable.get_depfile() is not None:
+            return None
+        input_hashes = [self._get_hash(path, FileStat.from_path(path)) for path in self._get_inputs(runnable)]
+        if any(input_hash in (None, "IS_DIR") for input_hash in input_hashes):
+            return None
+        key_content = {
+            "id": runnable.get_id(),
+            "config": runnable.get_config(),
+            "inputs": input_hashes,
+            "outputs": [path.name for path in runnable.get_outputs()],
+        }
+        return hashlib.new(self.file_hasher.algorithm, json.dumps(key_content, sort_keys=True).encode()).hexdigest()
+
+    def _get_process_pool(self) -> LogForwardingProcessPool:
+        with self._process_pool_lock:
+            if self._process_pool is None:
+                self._process_pool = LogForwardingProcessPool(self.process_pool_workers)
+            return self._process_pool
+
+    def _run(self, runnable: Runnable) -> int:
+        if runnable.timeout_sec is None:
+            if runnable.cpu_bound and self.process_pool_workers:
+                return self._get_process_pool().submit(runnable.run).result()
+            return runnable.run()
+        exit_code = run_with_timeout(runnable.run, runnable.timeout_sec)
+        if exit_code is None:
+            raise _RunnableTimeoutError(f"Runnable '{runnable.get_name()}' timed out after {runnable.timeout_sec}s. Its process tree was terminated.")
+        return exit_code
+
+    def _restore_artifacts(self, runnable: Runnable) -> tuple[str | None, bool]:
+        """Try to restore the runnable outputs from the artifact cache. Returns the artifact key and whether the outputs were restored."""
+        if self.artifact_cache is None or self.force_run:
+            return None, False
+        artifact_key = self.get_artifact_key(runnable)
+        if artifact_key is None:
+            return None, False
+        if self.artifact_cache.restore(artifact_key, runnable.get_outputs()):
+            logger.info(f"Runnable '{runnable.get_name()}' outputs restored from the artifact cache.")
+            return artifact_key, True
+        return artifact_key, False
+
+    def _store_artifacts(self, runnable: Runnable, artifact_key: str | None, exit_code: int) -> None:
+        if self.artifact_cache is not None and artifact_key is not None and exit_code == 0:
+            self.artifact_cache.store(artifact_key, runnable.get_outputs())
+
+    def _run_or_restore(self, runnable: Runnable) -> int:
+        """Run the runnable unless its outputs can be restored from the artifact cache."""
+        artifact_key, restored = self._restore_artifacts(runnable)
+        if restored:
+            return 0
+        exit_code = self._run(runnable)
+        self._store_artifacts(runnable, artifact_key, exit_code)
+        return exit_code
+
     def execute(self, runnable: Runnable) -> int:
+        return self.execute_runnable(runnable).exit_code
+
+    def execute_runnable(self, runnable: Runnable) -> ExecutionResult:
+        """Execute the runnable if required and report whether its outputs changed."""
+        self.directory_listing.clear()
+        return self._measure_and_execute(runnable)
+
+    def _measure_and_execute(self, runnable: Runnable) -> ExecutionResult:
+        with self.metrics.measure(runnable.get_id(), runnable.get_name()) as runnable_metrics:
+            return self._execute_runnable(runnable, runnable_metrics)
+
+    def _timed_run(self, run: Callable[[], int], runnable_metrics: RunnableMetrics) -> int:
+        runnable_metrics.run_start_s = self.metrics.now()
+        try:
+            return run()
+        finally:
+            runnable_metrics.run_time_s = self.metrics.now() - runnable_metrics.run_start_s
+
+    def _execute_runnable(self, runnable: Runnable, runnable_metrics: RunnableMetrics) -> ExecutionResult:
         if not runnable.needs_dependency_management:
             logger.info(f"Runnable '{runnable.get_name()}' does not need dependency management. Executing directly.")
             if self.dry_run:
-                return 0
-            return runnable.run()
+                return ExecutionResult(0)
+            try:
+                exit_code = self._timed_run(partial(self._run, runnable), runnable_metrics)
+            except _RunnableTimeoutError as error:
+                return self._handle_timeout(runnable, None, error)
+            self.directory_listing.clear()
+            return ExecutionResult(exit_code)
+
+        check = self._check_run_info(runnable)
+        runnable_metrics.check_time_s = self.metrics.now() - runnable_metrics.start_s
+        if not check.status.should_run:
+            return self._handle_skipped(runnable, check)
+        logger.info(f"Runnable '{runnable.get_name()}' must run. {check.status.message}")
+        if self.dry_run:
+            return ExecutionResult(0, check.status)
+        try:
+            exit_code = self._timed_run(partial(self._run_or_restore, runnable), runnable_metrics)
+        except _RunnableTimeoutError as error:
+            return self._handle_timeout(runnable, check, error)
+        return self._handle_completed(runnable, check, exit_code, runnable_metrics)
+
+    def _handle_skipped(self, runnable: Runnable, check: _RunInfoCheck) -> ExecutionResult:
+        logger.info(f"Runnable '{runnable.get_name()}' execution skipped. {check.status.message}")
+        if check.stale_stats and check.previous_info is not None and not self.dry_run:
+            # Record the new stats of files with unchanged content to keep the next checks on the fast path
+            check.previous_info["file_stats"] = {**check.previous_info.get("file_stats", {}), **check.stale_stats}
+            self.run_info_backend.store(runnable.get_id(), check.previous_info)
+        return ExecutionResult(0, check.status, outputs_changed=False)
+
+    def _handle_timeout(self, runnable: Runnable, check: _RunInfoCheck | None, error: _RunnableTimeoutError) -> ExecutionResult:
+        logger.error(str(error))
+        self.directory_listing.clear()
+        if check is None:
+            return ExecutionResult(self.TIMEOUT_EXIT_CODE)
+        # The outputs are incomplete. Only record the timeout such that the next check reports it.
+        self.run_info_backend.store(runnable.get_id(), {"timed_out": True})
+        return ExecutionResult(self.TIMEOUT_EXIT_CODE, check.status)
+
+    def _handle_completed(self, runnable: Runnable, check: _RunInfoCheck, exit_code: int, runnable_metrics: RunnableMetrics) -> ExecutionResult:
+        # The run might have created or removed files matched by input glob patterns
+        self.directory_listing.clear()
+        run_info = self.store_run_info(runnable, runnable_metrics)
+        # Like ninja's restat: dependents need not be rebuilt because of outputs which are byte-identical to the previous ones
+        outputs_changed = check.previous_info is None or check.previous_info.get("outputs") != run_info["outputs"]
+        if not outputs_changed:
+            logger.info(f"Runnable '{runnable.get_name()}' outputs did not change.")
+        return ExecutionResult(exit_code, check.status, outputs_changed)
+
+    def _get_priorities(self, graph: RunnableGraph) -> dict[str, float]:
+        """Get the critical path length of every runnable. Runnables which never ran are expected to take the average duration."""
+        all_durations = self.run_durations.get_all()
+        durations = {runnable_id: all_durations[runnable_id] for runnable_id in graph.runnables if runnable_id in all_durations}
+        default_duration = sum(durations.values()) / len(durations) if durations else self.DEFAULT_RUN_DURATION_SEC
+        return graph.get_critical_path_lengths(durations, default_duration)
+
+    def execute_all(self, runnables: Sequence[Runnable], max_workers: int | None = None) -> dict[str, int]:
+        """
+        Execute the runnables concurrently while respecting the dependencies between them.
 
-        run_info_status = self.previous_run_info_matches(runnable)
-        if run_info_status.should_run:
-            logger.info(f"Runnable '{runnable.get_name()}' must run. {run_info_status.message}")
-            if self.dry_run:
-                return 0
-            exit_code = runnable.run()
-            self.store_run_info(runnable)
-            return exit_code
-        logger.info(f"Runnable '{runnable.get_name()}' execution skipped. {run_info_status.message}")
+        A runnable is started only after all runnables producing its inputs finished successfully
+        and when its required resources are available.
+        Ready runnables on the longest remaining chain of runnables, based on their previous run durations, are started first.
+        Runnables depending on a failed runnable are not executed and are not part of the result.
+
+        Args:
+        ----
+            runnables: runnables to be executed
+            max_workers: maximum number of runnables executed at the same time. Defaults to the number of CPUs.
+
+        Returns:
+        -------
+            The exit code of every executed runnable, by runnable id.
 
-        return 0
+        """
+        graph = RunnableGraph(runnables)
+        # The directory listings are shared by all runnables of this build
+        self.directory_listing.clear()
+        workers_count = max_workers or os.cpu_count() or 1
+        pending_dependencies = {runnable_id: len(graph.get_dependencies(runnable_id)) for runnable_id in graph.runnables}
+        ready = [runnable_id for runnable_id, count in pending_dependencies.items() if count == 0]
+        priorities = self._get_priorities(graph)
+        resource_pool = ResourcePool(self.resource_limits)
+        exit_codes: dict[str, int] = {}
+        try:
+            with ThreadPoolExecutor(max_workers=workers_count, thread_name_prefix="runnable") as pool:
+                running: dict[Future[ExecutionResult], str] = {}
+                while ready or running:
+                    while len(running) < workers_count:
+                        # Start the ready runnable with the longest critical path whose resources are available
+                        runnable_id = max((runnable_id for runnable_id in ready if resource_pool.fits(graph.runnables[runnable_id])), key=priorities.__getitem__, default=None)
+                        if runnable_id is None:
+                            break
+                        ready.remove(runnable_id)
+                        resource_pool.acquire(graph.runnables[runnable_id])
+                        running[pool.submit(self._measure_and_execute, graph.runnables[runnable_id])] = runnable_id
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        runnable_id = running.pop(future)
+                        resource_pool.release(graph.runnables[runnable_id])
+                        execution_result = future.result()
+                        exit_codes[runnable_id] = execution_result.exit_code
+                        if exit_codes[runnable_id] != 0:
+                            logger.error(
+                                f"Runnable '{graph.runnables[runnable_id].get_name()}' failed with exit code {exit_codes[runnable_id]}. Its dependents will not be executed."
+                            )
+                            continue
+                        for dependent_id in graph.get_dependents(runnable_id):
+                            pending_dependencies[dependent_id] -= 1
+                            if pending_dependencies[dependent_id] == 0:
+                                ready.append(dependent_id)
+        finally:
+            # Also persist the run info of the runnables completed before a run() raised
+            self.flush()
+        return exit_codes
+
+    def watch(
+        self,
+        runnables: Sequence[Runnable],
+        stop_event: threading.Event,
+        max_workers: int | None = None,
+        file_watcher_factory: Callable[[list[Path]], FileWatcher] = create_file_watcher,
+        on_executed: Callable[[dict[str, int]], None] | None = None,
+    ) -> None:
+        """
+        Execute the runnables and re-execute them whenever their inputs change, until the stop event is set.
+
+        The dependency graph and the run info are kept in memory between the executions.
+        Only the runnables with changed inputs and their dependents are re-executed.
+        Inputs produced by one of the runnables are not watched, they are updated by the execution itself.
+
+        Args:
+        ----
+            runnables: runnables to be executed
+            stop_event: set it (e.g. from a signal handler or another thread) to stop watching
+            max_workers: see execute_all
+            file_watcher_factory: creates the watcher for the input paths. Defaults to inotify if available, otherwise stat polling.
+            on_executed: called with the exit codes after every (re-)execution
+
+        """
+        graph = RunnableGraph(runnables)
+        watched_paths = graph.get_watched_paths()
+        run_info_backend = self.run_info_backend
+        self.run_info_backend = MemoryCachedRunInfoBackend(run_info_backend)
+        try:
+            with file_watcher_factory(watched_paths) as file_watcher:
+                affected_ids = list(graph.runnables)
+                while not stop_event.is_set():
+                    if affected_ids:
+                        exit_codes = self.execute_all([graph.runnables[runnable_id] for runnable_id in affected_ids], max_workers)
+                        if on_executed:
+                            on_executed(exit_codes)
+                        logger.info(f"Watching {len(watched_paths)} inputs for changes.")
+                    changed_paths = file_watcher.wait_for_changes(self.WATCH_STOP_CHECK_INTERVAL_SEC)
+                    affected_ids = graph.get_affected(changed_paths) if changed_paths else []
+                    if affected_ids:
+                        logger.info(f"Changed inputs: {', '.join(str(path) for path in sorted(changed_paths))}")
+        finally:
+            self.run_info_backend = run_info_backend
@@ -0,0 +1,63 @@
+import contextlib
+import multiprocessing
+import os
+import signal
+import subprocess  # nosec
+import sys
+from collections.abc import Callable
+
+#: Seconds to wait for the process tree to terminate gracefully before killing it
+TERMINATE_GRACE_PERIOD_SEC = 5.0
+
+
+def _run_as_process_group_leader(target: Callable[[], int]) -> None:
+    # A new session makes the process the leader of a process group containing all processes it starts
+    if hasattr(os, "setsid"):
+        os.setsid()
+    sys.exit(target())
+
+
+def _terminate_process_tree(process: multiprocessing.process.BaseProcess) -> None:
+    if process.pid is None:
+        return
+    if sys.platform == "win32":
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], capture_output=True, check=False)  # noqa: S603, S607
+        process.join(TERMINATE_GRACE_PERIOD_SEC)
+        return
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        # The process did not create its process group yet
+        process.terminate()
+    process.join(TERMINATE_GRACE_PERIOD_SEC)
+    # Kill the remaining processes of the group, even if the group leader already terminated
+    with contextlib.suppress(ProcessLookupError):
+        os.killpg(process.pid, signal.SIGKILL)
+    if process.is_alive():
+        process.kill()
+    process.join()
+
+
+def run_with_timeout(target: Callable[[], int], timeout_sec: float) -> int | None:
+    """
+    Run the target in a separate process and terminate the process and all its children after the timeout.
+
+    (!) The target must be picklable on platforms not using ``fork`` to start processes (Windows, macOS).
+
+    Returns
+    -------
+        The exit code of the target or None if it timed out.
+
+    """
+    process = multiprocessing.Process(target=_run_as_process_group_leader, args=(target,), daemon=False)
+    process.start()
+    try:
+        process.join(timeout_sec)
+    except BaseException:
+        # The process runs in its own session and does not receive the interrupt (e.g. Ctrl+C) of the terminal
+        _terminate_process_tree(process)
+        raise
+    if process.is_alive():
+        _terminate_process_tree(process)
+        return None
+    return process.exitcode
@@ -0,0 +1,40 @@
+from pathlib import Path
+
+import pytest
+
+from py_app_dev.core.artifact_cache import ArtifactCache
+
+
+@pytest.fixture
+def outputs(tmp_path: Path) -> list[Path]:
+    result = [tmp_path / "out" / "first.bin", tmp_path / "out" / "second.bin"]
+    result[0].parent.mkdir()
+    for output in result:
+        output.write_text(output.name)
+    return result
+
+
+def test_store_and_restore(tmp_path: Path, outputs: list[Path]) -> None:
+    artifact_cache = ArtifactCache(tmp_path / "artifacts")
+    assert not artifact_cache.restore("key", outputs)
+    artifact_cache.store("key", outputs)
+    for output in outputs:
+        output.write_text("overwritten")
+    assert artifact_cache.restore("key", outputs)
+    assert [output.read_text() for output in outputs] == ["first.bin", "second.bin"]
+
+
+def test_identical_content_is_stored_once(tmp_path: Path, outputs: list[Path]) -> None:
+    artifact_cache = ArtifactCache(tmp_path / "artifacts")
+    artifact_cache.store("first_key", outputs)
+    artifact_cache.store("second_key", outputs)
+    assert artifact_cache.get_size() == sum(output.stat().st_size for output in outputs)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path, outputs: list[Path]) -> None:
+    artifact_cache = ArtifactCache(tmp_path / "artifacts", max_size_bytes=15)
+    artifact_cache.store("first_key", outputs[:1])
+    artifact_cache.store("second_key", outputs[1:])
+    assert not artifact_cache.restore("first_key", outputs[:1])
+    assert artifact_cache.restore("second_key", outputs[1:])
+    assert artifact_cache.get_size() <= 15
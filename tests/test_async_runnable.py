@@ -0,0 +1,149 @@
+import asyncio
+import threading
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+
+from py_app_dev.core.async_runnable import AsyncExecutor, AsyncRunnable
+from py_app_dev.core.runnable import Executor, RunInfoStatus, Runnable
+
+
+class Rendezvous:
+    """Lets the given number of tasks wait for each other (asyncio.Barrier requires Python 3.11)."""
+
+    def __init__(self, parties: int) -> None:
+        self._parties = parties
+        self._arrived = 0
+        self._all_arrived = asyncio.Event()
+
+    async def wait(self) -> None:
+        self._arrived += 1
+        if self._arrived == self._parties:
+            self._all_arrived.set()
+        await self._all_arrived.wait()
+
+
+class SleepingRunnable(AsyncRunnable):
+    def __init__(
+        self,
+        name: str,
+        execution_order: list[str],
+        inputs: list[Path] | None = None,
+        outputs: list[Path] | None = None,
+        return_code: int = 0,
+        rendezvous: Rendezvous | None = None,
+    ) -> None:
+        super().__init__()
+        self._name = name
+        self._execution_order = execution_order
+        self._inputs = inputs or []
+        self._outputs = outputs or []
+        self._return_code = return_code
+        self._rendezvous = rendezvous
+
+    def get_name(self) -> str:
+        return self._name
+
+    async def run_async(self) -> int:
+        if self._rendezvous:
+            await asyncio.wait_for(self._rendezvous.wait(), timeout=5)
+        await asyncio.sleep(0)
+        for output in self._outputs:
+            output.write_text(self._name)
+        self._execution_order.append(self._name)
+        return self._return_code
+
+    def get_inputs(self) -> list[Path]:
+        return self._inputs
+
+    def get_outputs(self) -> list[Path]:
+        return self._outputs
+
+
+@pytest.fixture
+def async_executor(tmp_path: Path) -> Generator[AsyncExecutor, None, None]:
+    with AsyncExecutor(cache_dir=tmp_path / "cache") as executor:
+        yield executor
+
+
+def test_execute_async_stores_run_info(async_executor: AsyncExecutor, tmp_path: Path) -> None:
+    input_path = tmp_path / "input.txt"
+    input_path.write_text("input")
+    runnable = SleepingRunnable("sleep", [], inputs=[input_path], outputs=[tmp_path / "output.txt"])
+    assert asyncio.run(async_executor.execute_async(runnable)) == 0
+    # The run info is compatible with the synchronous executor
+    assert Executor(cache_dir=async_executor.cache_dir).previous_run_info_matches(runnable) == RunInfoStatus.MATCH
+    execution_result = asyncio.run(async_executor.execute_runnable_async(runnable))
+    assert execution_result.run_info_status == RunInfoStatus.MATCH
+    assert [runnable_metrics.runnable_id for runnable_metrics in async_executor.metrics.metrics] == ["sleep", "sleep"]
+
+
+def test_async_runnable_executed_by_synchronous_executor(tmp_path: Path) -> None:
+    execution_order: list[str] = []
+    assert Executor(cache_dir=tmp_path / "cache").execute(SleepingRunnable("sleep", execution_order)) == 0
+    assert execution_order == ["sleep"]
+
+
+def test_execute_all_async(async_executor: AsyncExecutor, tmp_path: Path) -> None:
+    execution_order: list[str] = []
+    intermediate = tmp_path / "intermediate.txt"
+    rendezvous = Rendezvous(2)
+    producer = SleepingRunnable("produce", execution_order, outputs=[intermediate])
+    consumer = SleepingRunnable("consume", execution_order, inputs=[intermediate], return_code=2)
+    # Both only complete when executed concurrently
+    first, second = (SleepingRunnable(name, execution_order, rendezvous=rendezvous) for name in ("first", "second"))
+    dependent = SleepingRunnable("dependent", execution_order, inputs=[tmp_path / "dependent.txt"])
+    failing = SleepingRunnable("failing", execution_order, outputs=[tmp_path / "dependent.txt"], return_code=1)
+    result = asyncio.run(async_executor.execute_all_async([consumer, producer, first, second, dependent, failing]))
+    assert result == {"produce": 0, "consume": 2, "first": 0, "second": 0, "failing": 1}
+    assert execution_order.index("produce") < execution_order.index("consume")
+    assert "dependent" not in execution_order
+
+
+class LimitedRunnable(SleepingRunnable):
+    def __init__(self, name: str, running: list[str], max_running: list[int]) -> None:
+        super().__init__(name, [])
+        self._running = running
+        self._max_running = max_running
+
+    def get_resources(self) -> dict[str, int]:
+        return {"linker": 1}
+
+    async def run_async(self) -> int:
+        self._running.append(self._name)
+        await asyncio.sleep(0.01)
+        self._max_running.append(len(self._running))
+        self._running.remove(self._name)
+        return 0
+
+
+def test_execute_all_async_respects_resource_limits(tmp_path: Path) -> None:
+    running: list[str] = []
+    max_running: list[int] = []
+    runnables: list[Runnable] = [LimitedRunnable(f"link{index}", running, max_running) for index in range(5)]
+    with AsyncExecutor(cache_dir=tmp_path / "cache", resource_limits={"linker": 2}) as executor:
+        assert asyncio.run(executor.execute_all_async(runnables)) == {f"link{index}": 0 for index in range(5)}
+    assert max(max_running) == 2
+
+
+def test_close_stops_worker_threads(tmp_path: Path) -> None:
+    with AsyncExecutor(cache_dir=tmp_path / "cache") as executor:
+        assert asyncio.run(executor.execute_async(SleepingRunnable("sleep", []))) == 0
+    assert not [thread for thread in threading.enumerate() if thread.name.startswith("async_executor")]
+
+
+class RaisingRunnable(SleepingRunnable):
+    async def run_async(self) -> int:
+        raise RuntimeError("Unexpected failure")
+
+
+def test_execute_all_async_persists_run_info_when_a_runnable_raises(tmp_path: Path) -> None:
+    input_path = tmp_path / "input.txt"
+    input_path.write_text("input")
+    succeeding = SleepingRunnable("succeed", [], inputs=[input_path])
+    with AsyncExecutor(cache_dir=tmp_path / "cache", index_run_info=True) as executor:
+        with pytest.raises(RuntimeError, match="Unexpected failure"):
+            asyncio.run(executor.execute_all_async([succeeding, RaisingRunnable("raise", [])]))
+        # Persisted before the executor is closed
+        assert Executor(cache_dir=tmp_path / "cache", index_run_info=True).previous_run_info_matches(succeeding) == RunInfoStatus.MATCH
@@ -0,0 +1,24 @@
+from pathlib import Path
+
+import pytest
+
+from py_app_dev.core.atomic_file import copy_file_atomically, write_text_atomically
+
+
+def test_write_text_atomically(tmp_path: Path) -> None:
+    file = tmp_path / "sub" / "data.json"
+    write_text_atomically(file, "first")
+    write_text_atomically(file, "second")
+    assert file.read_text() == "second"
+    copy_file_atomically(file, tmp_path / "copy" / "data.json")
+    assert (tmp_path / "copy" / "data.json").read_text() == "second"
+    assert sorted(path.name for path in tmp_path.rglob("*") if path.is_file()) == ["data.json", "data.json"]
+
+
+def test_failed_write_keeps_previous_content(tmp_path: Path) -> None:
+    file = tmp_path / "data.json"
+    write_text_atomically(file, "previous")
+    with pytest.raises(FileNotFoundError):
+        copy_file_atomically(tmp_path / "missing.json", file)
+    assert file.read_text() == "previous"
+    assert [path.name for path in tmp_path.iterdir()] == ["data.json"]
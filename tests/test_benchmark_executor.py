@@ -0,0 +1,42 @@
+import importlib.util
+import json
+import sys
+from collections.abc import Generator
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+
+
+@pytest.fixture
+def benchmark_executor() -> Generator[ModuleType, None, None]:
+    # The benchmarks are scripts, not part of the package
+    script = Path(__file__).parent.parent / "benchmarks" / "benchmark_executor.py"
+    spec = importlib.util.spec_from_file_location("benchmark_executor", script)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    try:
+        spec.loader.exec_module(module)
+        yield module
+    finally:
+        sys.modules.pop(spec.name)
+
+
+@pytest.mark.parametrize("backend", ["json_files", "json_index", "sqlite"])
+def test_benchmark_smoke(benchmark_executor: ModuleType, tmp_path: Path, backend: str) -> None:
+    output = tmp_path / "results.json"
+    arguments = ["--files", "20", "--runnables", "5", "--inputs-per-runnable", "3", "--backend", backend, "--no-memory"]
+    assert benchmark_executor.main([*arguments, "--workspace", str(tmp_path / "workspace"), "--output", str(output)]) == 0
+    results = json.loads(output.read_text())["results"]
+    assert set(results) == {
+        "store_run_info",
+        "first_build_execute",
+        "noop_build_execute",
+        "first_build_execute_all",
+        "noop_build_execute_all",
+        "cold_check",
+        "cold_check_many",
+        "warm_check",
+    }
+    assert benchmark_executor.main([*arguments, "--workspace", str(tmp_path / "workspace2"), "--baseline", str(output)]) == 0
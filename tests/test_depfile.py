@@ -0,0 +1,26 @@
+from pathlib import Path
+
+import pytest
+
+from py_app_dev.core.depfile import parse_depfile, read_depfile
+
+
+@pytest.mark.parametrize(
+    ("content", "expected_dependencies"),
+    [
+        ("main.o: main.c include/a.h\n", ["main.c", "include/a.h"]),
+        ("main.o: main.c \\\n  include/a.h \\\r\n  include/b.h\n", ["main.c", "include/a.h", "include/b.h"]),
+        # -MP adds phony targets for the headers
+        ("main.o: main.c a.h\n\na.h:\n", ["main.c", "a.h"]),
+        ("main.o main.d : main.c my\\ file.h cost$$.h hash\\#.h\n", ["main.c", "my file.h", "cost$.h", "hash#.h"]),
+        ("C:\\build\\main.o: C:\\src\\main.c C:\\src\\main.h\n", ["C:\\src\\main.c", "C:\\src\\main.h"]),
+        ("a.o: common.h\nb.o: common.h b.h\n", ["common.h", "b.h"]),
+        ("", []),
+    ],
+)
+def test_parse_depfile(content: str, expected_dependencies: list[str]) -> None:
+    assert parse_depfile(content) == expected_dependencies
+
+
+def test_read_missing_depfile(tmp_path: Path) -> None:
+    assert read_depfile(tmp_path / "main.d") == []
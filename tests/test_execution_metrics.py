@@ -0,0 +1,30 @@
+import json
+from pathlib import Path
+
+from py_app_dev.core.execution_metrics import ExecutionMetricsCollector
+
+
+def test_collect_and_export_metrics(tmp_path: Path) -> None:
+    collector = ExecutionMetricsCollector()
+    collector.record_hashing(100, 1.0)
+    with collector.measure("fast_id", "Fast") as fast_metrics:
+        fast_metrics.check_time_s = 0.5
+    with collector.measure("slow_id", "Slow") as slow_metrics:
+        collector.record_hashing(2_000_000, 0.25)
+        slow_metrics.check_time_s = 0.5
+        slow_metrics.run_start_s = 1.0
+        slow_metrics.run_time_s = 2.0
+
+    assert slow_metrics.to_run_info() == {"check_time_s": 0.5, "run_time_s": 2.0, "hashed_bytes": 2_000_000, "hash_time_s": 0.25}
+    assert fast_metrics.hashed_bytes == 0
+
+    summary_lines = collector.get_summary().splitlines()
+    assert [line.split()[0] for line in summary_lines[1:]] == ["Slow", "Fast"]
+    assert summary_lines[1].split()[1:] == ["2.500", "0.500", "0.250", "2.00", "2.000"]
+
+    trace_file = tmp_path / "trace.json"
+    collector.export_chrome_trace(trace_file)
+    events = json.loads(trace_file.read_text())["traceEvents"]
+    assert [event["name"] for event in events] == ["check Fast", "check Slow", "run Slow"]
+    assert events[2]["ts"] == 1e6
+    assert events[2]["dur"] == 2e6
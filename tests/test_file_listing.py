@@ -0,0 +1,80 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from py_app_dev.core.file_listing import DirectoryListingCache, get_glob_base, glob_matches
+
+
+@pytest.fixture
+def source_tree(tmp_path: Path) -> Path:
+    for file in ["main.c", "README.md", "lib/a.c", "lib/a.h", "lib/sub/b.c", "test/test.c"]:
+        (tmp_path / file).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / file).write_text(file)
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    ("pattern", "expected_files"),
+    [
+        ("*.c", ["main.c"]),
+        ("**/*.c", ["lib/a.c", "lib/sub/b.c", "main.c", "test/test.c"]),
+        ("lib/**", ["lib/a.c", "lib/a.h", "lib/sub/b.c"]),
+        ("*/a.[ch]", ["lib/a.c", "lib/a.h"]),
+        ("lib/sub/b.c", ["lib/sub/b.c"]),
+        ("missing/**/*.c", []),
+    ],
+)
+def test_glob(source_tree: Path, pattern: str, expected_files: list[str]) -> None:
+    assert DirectoryListingCache().glob(str(source_tree / pattern)) == [source_tree / file for file in expected_files]
+    assert all(glob_matches(str(source_tree / pattern), source_tree / file) for file in expected_files)
+
+
+def test_glob_relative_pattern(source_tree: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(source_tree)
+    assert DirectoryListingCache().glob("lib/*.c") == [Path("lib/a.c")]
+    assert DirectoryListingCache().glob("*.md") == [Path("README.md")]
+
+
+def test_directories_are_listed_once(source_tree: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    listed_directories: list[str] = []
+    original_scandir = os.scandir
+
+    def recording_scandir(path: str) -> "os._ScandirIterator[str]":
+        listed_directories.append(path)
+        return original_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", recording_scandir)
+    directory_listing = DirectoryListingCache()
+    directory_listing.glob(str(source_tree / "**/*.c"))
+    directory_listing.glob(str(source_tree / "**/*.h"))
+    assert len(listed_directories) == 4
+    directory_listing.clear()
+    directory_listing.glob(str(source_tree / "*.c"))
+    assert len(listed_directories) == 5
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink") or os.name == "nt", reason="Requires symbolic links")
+def test_recursive_glob_does_not_follow_directory_symlinks(source_tree: Path) -> None:
+    # The link forms a cycle, which must not be expanded endlessly
+    (source_tree / "lib/sub/loop").symlink_to(source_tree / "lib", target_is_directory=True)
+    directory_listing = DirectoryListingCache()
+    assert directory_listing.glob(str(source_tree / "lib/**/*.c")) == [source_tree / "lib/a.c", source_tree / "lib/sub/b.c"]
+    assert directory_listing.glob(str(source_tree / "lib/sub/loop/*.h")) == [source_tree / "lib/sub/loop/a.h"]
+
+
+def test_unlistable_directory_is_considered_empty(source_tree: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    original_scandir = os.scandir
+
+    def denying_scandir(path: str) -> "os._ScandirIterator[str]":
+        if Path(path) == source_tree / "lib/sub":
+            raise PermissionError(13, "Permission denied", path)
+        return original_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", denying_scandir)
+    assert DirectoryListingCache().glob(str(source_tree / "**/*.c")) == [source_tree / "lib/a.c", source_tree / "main.c", source_tree / "test/test.c"]
+
+
+def test_get_glob_base() -> None:
+    assert get_glob_base("src/lib/**/*.c") == Path("src/lib")
+    assert get_glob_base("*.c") == Path()
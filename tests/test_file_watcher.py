@@ -0,0 +1,46 @@
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from py_app_dev.core.file_watcher import FileWatcher, InotifyFileWatcher, PollingFileWatcher
+
+
+def create_polling_watcher(paths: list[Path]) -> FileWatcher:
+    return PollingFileWatcher(paths, interval_sec=0.01)
+
+
+def create_inotify_watcher(paths: list[Path]) -> FileWatcher:
+    if not InotifyFileWatcher.is_available():
+        pytest.skip("inotify is not available")
+    return InotifyFileWatcher(paths)
+
+
+@pytest.fixture(params=[create_polling_watcher, create_inotify_watcher])
+def watcher_factory(request: pytest.FixtureRequest) -> Callable[[list[Path]], FileWatcher]:
+    factory: Callable[[list[Path]], FileWatcher] = request.param
+    return factory
+
+
+def test_file_changes_detected(watcher_factory: Callable[[list[Path]], FileWatcher], tmp_path: Path) -> None:
+    watched_file, other_file, created_file = tmp_path / "watched.txt", tmp_path / "other.txt", tmp_path / "new" / "created.txt"
+    watched_file.write_text("content")
+    with watcher_factory([watched_file, created_file]) as watcher:
+        assert watcher.wait_for_changes(0.1) == set()
+        other_file.write_text("other")
+        assert watcher.wait_for_changes(0.1) == set()
+        watched_file.write_text("changed content")
+        assert watcher.wait_for_changes(2) == {watched_file}
+        created_file.parent.mkdir()
+        created_file.write_text("created")
+        assert created_file in watcher.wait_for_changes(2)
+
+
+def test_directory_changes_detected(watcher_factory: Callable[[list[Path]], FileWatcher], tmp_path: Path) -> None:
+    watched_dir = tmp_path / "src"
+    (watched_dir / "sub").mkdir(parents=True)
+    with watcher_factory([watched_dir]) as watcher:
+        (watched_dir / "sub" / "file.c").write_text("int x;")
+        assert watcher.wait_for_changes(2) == {watched_dir}
+        (watched_dir / "sub" / "file.c").unlink()
+        assert watcher.wait_for_changes(2) == {watched_dir}
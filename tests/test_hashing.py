@@ -0,0 +1,100 @@
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from py_app_dev.core.exceptions import UserNotificationException
+from py_app_dev.core.hashing import DirectoryHasher, FileHashCache, FileHasher, FileStat
+
+
+@pytest.mark.parametrize("algorithm", ["sha256", "blake2b"])
+@pytest.mark.parametrize("mmap_threshold", [None, 1])
+@pytest.mark.parametrize("content", [b"", b"some content spread over multiple chunks"])
+def test_hash_file(tmp_path: Path, algorithm: str, mmap_threshold: int | None, content: bytes) -> None:
+    file = tmp_path / "file.bin"
+    file.write_bytes(content)
+    file_hasher = FileHasher(algorithm, chunk_size=7, mmap_threshold=mmap_threshold)
+    assert file_hasher.hash_file(file) == hashlib.new(algorithm, content).hexdigest()
+
+
+@pytest.mark.parametrize("algorithm", ["not_an_algorithm", "shake_128", "shake_256"])
+def test_unsupported_algorithm(algorithm: str) -> None:
+    with pytest.raises(UserNotificationException, match="not supported"):
+        FileHasher(algorithm)
+
+
+def test_hash_cache_evicts_least_recently_used() -> None:
+    hash_cache = FileHashCache("sha256", max_entries=2)
+    first, second, third = Path("first"), Path("second"), Path("third")
+    file_stat = FileStat(1, 2, 3)
+    hash_cache.put(first, file_stat, "first_hash")
+    hash_cache.put(second, file_stat, "second_hash")
+    assert hash_cache.get(first, file_stat) == "first_hash"
+    hash_cache.put(third, file_stat, "third_hash")
+    assert hash_cache.get(second, file_stat) is None
+    assert hash_cache.get(first, file_stat) == "first_hash"
+    assert hash_cache.get(first, FileStat(1, 2, 4)) is None
+
+
+@pytest.mark.parametrize(("algorithm", "expected_hash"), [("sha256", "cached_hash"), ("blake2b", None)])
+def test_hash_cache_persistence(tmp_path: Path, algorithm: str, expected_hash: str | None) -> None:
+    store_file = tmp_path / "cache" / "hashes.json"
+    file_stat = FileStat(1, 2, 3)
+    hash_cache = FileHashCache("sha256", store_file=store_file)
+    hash_cache.put(Path("file.txt"), file_stat, "cached_hash")
+    hash_cache.save()
+    assert FileHashCache(algorithm, store_file=store_file).get(Path("file.txt"), file_stat) == expected_hash
+
+
+@pytest.fixture
+def source_tree(tmp_path: Path) -> Path:
+    root = tmp_path / "tree"
+    for relative_path in ("main.c", "lib/util.c", "lib/util.h", "build/main.o"):
+        file = root / relative_path
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text(relative_path)
+    return root
+
+
+def test_directory_hash_recomputes_only_changed_path(source_tree: Path) -> None:
+    file_hasher = FileHasher()
+    hashed_files: list[str] = []
+
+    def hash_file(path: Path, file_stat: FileStat) -> str:
+        hashed_files.append(path.relative_to(source_tree).as_posix())
+        return file_hasher.hash_file(path)
+
+    directory_hasher = DirectoryHasher(hash_file)
+    initial_digest = directory_hasher.hash_directory(source_tree)
+    assert sorted(hashed_files) == ["build/main.o", "lib/util.c", "lib/util.h", "main.c"]
+
+    hashed_files.clear()
+    assert directory_hasher.hash_directory(source_tree) == initial_digest
+    assert hashed_files == []
+
+    (source_tree / "lib/util.h").write_text("changed header")
+    assert directory_hasher.hash_directory(source_tree) != initial_digest
+    assert hashed_files == ["lib/util.h"]
+
+
+@pytest.mark.parametrize(
+    ("include_patterns", "exclude_patterns", "changed_file", "digest_changes"),
+    [
+        (None, ["build"], "build/main.o", False),
+        (None, ["build"], "main.c", True),
+        (["*.c"], None, "lib/util.h", False),
+        (["*.c"], None, "lib/util.c", True),
+    ],
+)
+def test_directory_hash_patterns(
+    source_tree: Path,
+    include_patterns: list[str] | None,
+    exclude_patterns: list[str] | None,
+    changed_file: str,
+    digest_changes: bool,
+) -> None:
+    file_hasher = FileHasher()
+    directory_hasher = DirectoryHasher(lambda path, file_stat: file_hasher.hash_file(path), include_patterns=include_patterns, exclude_patterns=exclude_patterns)
+    initial_digest = directory_hasher.hash_directory(source_tree)
+    (source_tree / changed_file).write_text("changed content")
+    assert (directory_hasher.hash_directory(source_tree) != initial_digest) == digest_changes
@@ -1,11 +1,15 @@
+import textwrap
+import threading
 from collections import OrderedDict
+from dataclasses import replace
 from pathlib import Path
 from typing import Any
 
 import pytest
 
 from py_app_dev.core.exceptions import UserNotificationException
-from py_app_dev.core.pipeline import PipelineLoader, PipelineStep, PipelineStepConfig
+from py_app_dev.core.pipeline import LazyStepClass, PipelineLoader, PipelineRunner, PipelineStep, PipelineStepConfig, PipelineStepReference
+from py_app_dev.core.runnable import Runnable
 
 
 def test_load_unknown_step():
@@ -75,3 +79,190 @@ def test_invalid_pipeline_config() -> None:
 
     with pytest.raises(UserNotificationException, match="Invalid pipeline configuration"):
         PipelineLoader[PipelineStep](invalid_pipeline_config, Path(".")).load_steps()
+
+
+def test_user_file_is_executed_once(tmp_path: Path) -> None:
+    steps_file = tmp_path / "steps.py"
+    executions_file = tmp_path / "executions.txt"
+    steps_file.write_text(
+        textwrap.dedent(
+            """\
+            from pathlib import Path
+            from py_app_dev.core.pipeline import PipelineStep
+            with Path(__file__).with_name("executions.txt").open("a") as executions:
+                executions.write("executed\\n")
+            class FirstStep(PipelineStep):
+                pass
+            class SecondStep(PipelineStep):
+                pass
+            """
+        )
+    )
+    pipeline_config = OrderedDict(
+        {
+            "generate": [PipelineStepConfig(step="FirstStep", file="steps.py")],
+            "test": [PipelineStepConfig(step="SecondStep", file="steps.py"), PipelineStepConfig(step="FirstStep", file="steps.py")],
+        }
+    )
+    steps = PipelineLoader[PipelineStep](pipeline_config, tmp_path).load_steps()
+    assert steps[0]._class is steps[2]._class
+    assert steps[0]._class.__module__ == steps[1]._class.__module__
+    assert executions_file.read_text().splitlines() == ["executed"]
+    # Another loader executes the file again
+    assert PipelineLoader[PipelineStep](pipeline_config, tmp_path).load_steps()[1]._class.__name__ == "SecondStep"
+    assert executions_file.read_text().splitlines() == ["executed", "executed"]
+
+
+def test_step_classes_are_loaded_lazily(my_python_file: Path) -> None:
+    pipeline_config = OrderedDict(
+        {
+            "install": [PipelineStepConfig(step="MyStep", file=str(my_python_file))],
+            "test": [
+                PipelineStepConfig(step="Missing", module="module_which_does_not_exist"),
+                PipelineStepConfig(step="Other", class_name="MyStep", file=str(my_python_file)),
+            ],
+        }
+    )
+    loader = PipelineLoader[PipelineStep](pipeline_config, my_python_file.parent)
+    steps = loader.load_steps()
+    assert [(step.group_name, step.name) for step in steps] == [("install", "MyStep"), ("test", "Missing"), ("test", "Other")]
+    # References to the same step class are equal without importing it
+    assert loader.load_steps() == steps
+    assert steps[0].class_handle == steps[2].class_handle
+    assert steps[0].class_handle != steps[1].class_handle
+    with pytest.raises(UserNotificationException, match="module_which_does_not_exist"):
+        steps[1]._class  # noqa: B018
+    assert [step._class.__name__ for step in loader.load_steps(groups=["install"])] == ["MyStep"]
+    assert [step.name for step in loader.load_steps(steps=["Other", "MyStep"])] == ["MyStep", "Other"]
+    assert loader.load_steps(groups=["install"], steps=["Other"]) == []
+    with pytest.raises(UserNotificationException, match="Unknown pipeline groups: deploy"):
+        loader.load_steps(groups=["deploy"])
+
+
+class OtherPipelineStep(MyCustomPipelineStep):
+    pass
+
+
+def test_step_reference_accepts_class_keyword() -> None:
+    reference = PipelineStepReference[MyCustomPipelineStep](group_name="install", _class=MyCustomPipelineStep, config={"data": "value"})
+    assert reference._class is MyCustomPipelineStep
+    assert PipelineStepReference("install", MyCustomPipelineStep) == PipelineStepReference("install", class_handle=MyCustomPipelineStep)
+    lazy_reference = replace(reference, class_handle=LazyStepClass(lambda: OtherPipelineStep))
+    assert lazy_reference._class is OtherPipelineStep
+    assert lazy_reference.config == {"data": "value"}
+    assert replace(lazy_reference, name="other")._class is OtherPipelineStep
+
+
+def _create_step_references(groups: dict[str, list[str] | None]) -> list[PipelineStepReference[MyCustomPipelineStep]]:
+    return [
+        PipelineStepReference(group_name, MyCustomPipelineStep, name=f"{group_name}_{index}", depends_on=depends_on)
+        for group_name, depends_on in groups.items()
+        for index in range(2)
+    ]
+
+
+def test_independent_groups_run_concurrently() -> None:
+    step_references = _create_step_references({"install": None, "lint": ["install"], "test": ["install"], "report": ["lint", "test"]})
+    barrier = threading.Barrier(2, timeout=5)
+    executed_steps: list[str] = []
+
+    def execute_step(step_reference: PipelineStepReference[MyCustomPipelineStep]) -> int:
+        if step_reference.name in ("lint_0", "test_0"):
+            # Only passes if both groups run at the same time
+            barrier.wait()
+        executed_steps.append(str(step_reference.name))
+        return 0
+
+    assert PipelineRunner(step_references).run(execute_step) == {"install": 0, "lint": 0, "test": 0, "report": 0}
+    assert executed_steps[:2] == ["install_0", "install_1"]
+    assert executed_steps[-2:] == ["report_0", "report_1"]
+    assert executed_steps.index("lint_0") < executed_steps.index("lint_1")
+
+
+def test_groups_without_dependencies_run_sequentially() -> None:
+    step_references = _create_step_references({"install": None, "build": None, "test": None})
+    executed_steps: list[str] = []
+
+    def execute_step(step_reference: PipelineStepReference[MyCustomPipelineStep]) -> int:
+        executed_steps.append(str(step_reference.name))
+        return 0
+
+    PipelineRunner(step_references, max_workers=4).run(execute_step)
+    assert executed_steps == ["install_0", "install_1", "build_0", "build_1", "test_0", "test_1"]
+
+
+def test_failed_group_skips_dependent_groups() -> None:
+    step_references = _create_step_references({"install": [], "lint": [], "test": ["install"], "report": ["test"]})
+    executed_steps: list[str] = []
+
+    def execute_step(step_reference: PipelineStepReference[MyCustomPipelineStep]) -> int:
+        executed_steps.append(str(step_reference.name))
+        return 3 if step_reference.name == "install_0" else 0
+
+    assert PipelineRunner(step_references, max_workers=1).run(execute_step) == {"install": 3, "lint": 0}
+    assert "install_1" not in executed_steps
+    assert sorted(executed_steps) == ["install_0", "lint_0", "lint_1"]
+
+
+def test_group_dependencies_are_validated(my_python_file: Path) -> None:
+    with pytest.raises(UserNotificationException, match="defined after it: test"):
+        PipelineRunner(_create_step_references({"install": ["test"], "test": []}))
+    # Dependencies on filtered groups are ignored
+    runner = PipelineRunner(_create_step_references({"test": ["install"]}))
+    assert runner.group_dependencies == {"test": set()}
+    pipeline_config = OrderedDict({"install": [PipelineStepConfig(step="MyStep", file=str(my_python_file), depends_on=["deploy"])]})
+    with pytest.raises(UserNotificationException, match="depend on unknown pipeline groups: deploy"):
+        PipelineLoader[PipelineStep](pipeline_config, my_python_file.parent).load_steps()
+
+
+class FileStep(Runnable):
+    def __init__(self, name: str, inputs: list[str], outputs: list[str]) -> None:
+        super().__init__()
+        self.name = name
+        self.inputs = inputs
+        self.outputs = outputs
+
+    def get_name(self) -> str:
+        return self.name
+
+    def run(self) -> int:
+        return 0
+
+    def get_inputs(self) -> list[Path]:
+        return [Path(input_path) for input_path in self.inputs]
+
+    def get_outputs(self) -> list[Path]:
+        return [Path(output) for output in self.outputs]
+
+
+def test_select_steps_affected_by_changed_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    step_references = [
+        PipelineStepReference("generate", FileStep, {"inputs": ["model.json"], "outputs": ["gen/model.c"]}, name="generate"),
+        PipelineStepReference("compile", FileStep, {"inputs": ["src/main.c"], "outputs": ["build/main.o"]}, name="compile_main"),
+        PipelineStepReference("compile", FileStep, {"inputs": ["gen/model.c"], "outputs": ["build/model.o"]}, name="compile_model"),
+        PipelineStepReference("docs", FileStep, {"inputs": ["docs"], "outputs": ["build/html"]}, name="docs"),
+        PipelineStepReference("link", FileStep, {"inputs": ["build/main.o", "build/model.o"], "outputs": ["build/app"]}, name="link"),
+    ]
+    created_steps: list[str] = []
+
+    def create_runnable(step_reference: PipelineStepReference[FileStep]) -> Runnable:
+        created_steps.append(str(step_reference.name))
+        return step_reference._class(str(step_reference.name), **(step_reference.config or {}))
+
+    runner = PipelineRunner(step_references)
+    docs_runner = runner.select_affected([Path("docs/index.md")], create_runnable)
+    assert created_steps == [step_reference.name for step_reference in step_references]
+    assert {group_name: [step.name for step in steps] for group_name, steps in docs_runner.groups.items()} == {"docs": ["docs"]}
+    assert docs_runner.group_dependencies == {"docs": set()}
+
+    model_runner = runner.select_affected([tmp_path / "model.json"], create_runnable)
+    assert {group_name: [step.name for step in steps] for group_name, steps in model_runner.groups.items()} == {
+        "generate": ["generate"],
+        "compile": ["compile_model"],
+        "link": ["link"],
+    }
+    # The link group still waits for the compile group, although the docs group in between is skipped
+    assert model_runner.group_dependencies == {"generate": set(), "compile": {"generate"}, "link": {"compile"}}
+    assert list(runner.select_affected([Path("build/main.o")], create_runnable).groups) == ["link"]
+    assert runner.select_affected([Path("README.md")], create_runnable).groups == {}
@@ -0,0 +1,109 @@
+import argparse
+import importlib
+import os
+import socket
+import socketserver
+import stat
+import sys
+import threading
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+
+from py_app_dev.core.exceptions import UserNotificationException
+from py_app_dev.core.logging import logger
+from py_app_dev.core.pipeline_daemon import PipelineDaemon, PipelineDaemonClient
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets are not available")
+
+
+class Invocations:
+    def __init__(self) -> None:
+        self.executed: list[tuple[list[str], str]] = []
+
+    def execute(self, args: list[str]) -> int:
+        self.executed.append((args, os.getcwd()))
+        logger.info(f"Invocation {len(self.executed)}")
+        if args == ["fail"]:
+            raise UserNotificationException("Step failed")
+        if args == ["crash"]:
+            raise RuntimeError("Unexpected")
+        if args and args[0].startswith("-"):
+            parser = argparse.ArgumentParser()
+            parser.add_argument("--jobs", type=int)
+            parser.parse_args(args)
+        return len(args)
+
+
+@pytest.fixture
+def socket_path(tmp_path: Path) -> Path:
+    # Unix socket paths are limited to about 100 characters
+    return tmp_path / "d.sock"
+
+
+@pytest.fixture
+def invocations(socket_path: Path) -> Generator[Invocations, None, None]:
+    invocations = Invocations()
+    daemon = PipelineDaemon(socket_path, invocations.execute)
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    client = PipelineDaemonClient(socket_path)
+    while thread.is_alive() and not client.is_running():
+        threading.Event().wait(0.01)
+    yield invocations
+    daemon.shutdown()
+    thread.join(timeout=5)
+
+
+def test_daemon_executes_invocations(socket_path: Path, invocations: Invocations, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    logs: list[str] = []
+    client = PipelineDaemonClient(socket_path, on_log=logs.append)
+    monkeypatch.chdir(tmp_path)
+    assert client.run(["build", "--verbose"]) == 2
+    assert client.run([]) == 0
+    # The state of the daemon is kept between the invocations
+    assert invocations.executed == [(["build", "--verbose"], str(tmp_path)), ([], str(tmp_path))]
+    assert [log.split("|")[-1].strip() for log in logs] == ["Invocation 1", "Invocation 2"]
+
+
+def test_daemon_reports_failures(socket_path: Path, invocations: Invocations) -> None:
+    logs: list[str] = []
+    client = PipelineDaemonClient(socket_path, on_log=logs.append)
+    assert client.run(["fail"]) == 1
+    assert any("Step failed" in log for log in logs)
+    assert client.run(["crash"]) == 1
+    assert any("Unexpected" in log for log in logs)
+    # argparse exits for --help and invalid arguments
+    assert client.run(["--help"]) == 0
+    assert client.run(["--jobs", "many"]) == 2
+    # The daemon survives failed invocations
+    assert client.run(["ok"]) == 1
+
+
+def test_client_stops_daemon(socket_path: Path, invocations: Invocations) -> None:
+    client = PipelineDaemonClient(socket_path)
+    client.stop()
+    for _ in range(500):
+        if not socket_path.exists():
+            break
+        threading.Event().wait(0.01)
+    assert not client.is_running()
+    with pytest.raises(UserNotificationException, match="No pipeline daemon is running"):
+        client.run([])
+
+
+def test_only_one_daemon_per_socket(socket_path: Path, invocations: Invocations) -> None:
+    with pytest.raises(UserNotificationException, match="already running"):
+        PipelineDaemon(socket_path, invocations.execute).serve_forever()
+
+
+def test_only_owner_can_connect(socket_path: Path, invocations: Invocations) -> None:
+    assert stat.S_IMODE(socket_path.stat().st_mode) == 0o600
+    assert [path.name for path in socket_path.parent.iterdir()] == [socket_path.name]
+
+
+def test_module_importable_without_unix_sockets(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delattr(socketserver, "UnixStreamServer")
+    monkeypatch.delitem(sys.modules, "py_app_dev.core.pipeline_daemon")
+    assert importlib.import_module("py_app_dev.core.pipeline_daemon").PipelineDaemonClient
@@ -0,0 +1,51 @@
+import json
+from pathlib import Path
+
+from py_app_dev.core.run_info import JsonFilesRunInfoBackend, JsonIndexRunInfoBackend, RunInfoBackend, SqliteRunInfoBackend
+
+
+def test_json_files_backend(tmp_path: Path) -> None:
+    backend = JsonFilesRunInfoBackend(tmp_path / "cache")
+    assert backend.load("step") is None
+    backend.store("step", {"inputs": {"a.txt": "hash"}})
+    assert backend.get_file("step").exists()
+    assert JsonFilesRunInfoBackend(tmp_path / "cache").load("step") == {"inputs": {"a.txt": "hash"}}
+
+
+def test_sqlite_backend_batches_writes_until_flush(tmp_path: Path) -> None:
+    database_file = tmp_path / "cache" / SqliteRunInfoBackend.DEFAULT_DATABASE_FILE
+    backend = SqliteRunInfoBackend(database_file)
+    backend.store("first", {"inputs": {}})
+    backend.store("second", {"outputs": {"b.txt": "hash"}})
+    assert backend.load("first") == {"inputs": {}}
+    assert SqliteRunInfoBackend(database_file).load("first") is None
+
+    backend.close()
+    reopened_backend: RunInfoBackend = SqliteRunInfoBackend(database_file)
+    assert reopened_backend.load("first") == {"inputs": {}}
+    assert reopened_backend.load("second") == {"outputs": {"b.txt": "hash"}}
+    assert reopened_backend.load("third") is None
+
+
+def test_json_index_backend_writes_dirty_run_info_on_flush(tmp_path: Path) -> None:
+    index_file = tmp_path / "cache" / JsonIndexRunInfoBackend.DEFAULT_INDEX_FILE
+    backend = JsonIndexRunInfoBackend(index_file)
+    other_backend = JsonIndexRunInfoBackend(index_file)
+    backend.store("first", {"inputs": {}})
+    assert backend.load("first") == {"inputs": {}}
+    assert not index_file.exists()
+
+    backend.flush()
+    # Entries flushed by other executors are preserved
+    other_backend.store("second", {"outputs": {"b.txt": "hash"}})
+    other_backend.flush()
+    assert json.loads(index_file.read_text()) == {"first": {"inputs": {}}, "second": {"outputs": {"b.txt": "hash"}}}
+    assert "\n" not in index_file.read_text()
+    assert [path.name for path in index_file.parent.iterdir()] == [index_file.name]
+
+
+def test_json_index_backend_flushes_periodically(tmp_path: Path) -> None:
+    index_file = tmp_path / JsonIndexRunInfoBackend.DEFAULT_INDEX_FILE
+    backend = JsonIndexRunInfoBackend(index_file, flush_interval_sec=0)
+    backend.store("first", {"inputs": {}})
+    assert JsonIndexRunInfoBackend(index_file).load("first") == {"inputs": {}}
@@ -1,10 +1,23 @@
 import json
+import multiprocessing
 import os
+import subprocess
+import sys
+import threading
+import time
 from pathlib import Path
+from typing import Any
 
 import pytest
 
-from py_app_dev.core.runnable import Executor, RunInfoStatus, Runnable
+from py_app_dev.core.artifact_cache import ArtifactCache
+from py_app_dev.core.exceptions import UserNotificationException
+from py_app_dev.core.file_watcher import PollingFileWatcher
+from py_app_dev.core.hashing import FileHasher
+from py_app_dev.core.logging import logger
+from py_app_dev.core.run_info import JsonIndexRunInfoBackend, SqliteRunInfoBackend
+from py_app_dev.core.runnable import ExecutionResult, Executor, RunInfoStatus, Runnable, RunnableGraph
+from py_app_dev.core.watchdog import run_with_timeout
 
 
 class MyRunnable(Runnable):
@@ -40,6 +53,20 @@ def executor(tmp_path: Path) -> Executor:
     return Executor(cache_dir=cache_dir)
 
 
+@pytest.fixture
+def hashed_paths(monkeypatch: pytest.MonkeyPatch) -> list[Path]:
+    """Record the paths of all files hashed by any executor."""
+    paths: list[Path] = []
+    original_get_file_hash = Executor.get_file_hash
+
+    def recording_get_file_hash(path: Path, file_hasher: FileHasher | None = None) -> str | None:
+        paths.append(path)
+        return original_get_file_hash(path, file_hasher)
+
+    monkeypatch.setattr(Executor, "get_file_hash", staticmethod(recording_get_file_hash))
+    return paths
+
+
 def test_no_previous_info(executor: Executor) -> None:
     runnable = MyRunnable()
     assert executor.previous_run_info_matches(runnable) == RunInfoStatus.NO_INFO
@@ -293,3 +320,584 @@ def test_custom_get_id_deps_files_are_independent(executor: Executor, tmp_path:
 
     # Second runnable should still need to run (no previous info for its ID)
     assert executor.previous_run_info_matches(runnable2) == RunInfoStatus.NO_INFO
+
+
+class RecordingRunnable(MyRunnable):
+    def __init__(
+        self,
+        name: str,
+        execution_order: list[str],
+        inputs: list[Path] | None = None,
+        outputs: list[Path] | None = None,
+        return_code: int = 0,
+        barrier: threading.Barrier | None = None,
+    ) -> None:
+        super().__init__(inputs=inputs, outputs=outputs, return_code=return_code)
+        self._name = name
+        self._execution_order = execution_order
+        self._barrier = barrier
+
+    def get_name(self) -> str:
+        return self._name
+
+    def run(self) -> int:
+        if self._barrier:
+            self._barrier.wait()
+        for output in self._outputs:
+            output.write_text(self._name)
+        self._execution_order.append(self._name)
+        return self._return_code
+
+
+def test_runnable_graph_dependencies(tmp_path: Path) -> None:
+    generated_dir = tmp_path / "generated"
+    generate = RecordingRunnable("generate", [], outputs=[generated_dir])
+    compile_step = RecordingRunnable("compile", [], inputs=[generated_dir / "file.c"], outputs=[tmp_path / "file.o"])
+    link = RecordingRunnable("link", [], inputs=[tmp_path / "file.o"])
+    graph = RunnableGraph([link, compile_step, generate])
+    assert graph.get_dependencies("compile") == {"generate"}
+    assert graph.get_dependents("compile") == ["link"]
+    assert graph.get_topological_order() == ["generate", "compile", "link"]
+
+
+@pytest.mark.parametrize(
+    ("first_outputs", "second_name"),
+    [
+        (["b.txt"], "second"),
+        ([], "first"),
+    ],
+)
+def test_runnable_graph_invalid(tmp_path: Path, first_outputs: list[str], second_name: str) -> None:
+    first = RecordingRunnable("first", [], inputs=[tmp_path / "a.txt"], outputs=[tmp_path / name for name in first_outputs])
+    second = RecordingRunnable(second_name, [], inputs=[tmp_path / "b.txt"], outputs=[tmp_path / "a.txt"])
+    with pytest.raises(UserNotificationException):
+        RunnableGraph([first, second])
+
+
+def test_execute_all_respects_dependencies(executor: Executor, tmp_path: Path) -> None:
+    execution_order: list[str] = []
+    source, intermediate = tmp_path / "source.txt", tmp_path / "intermediate.txt"
+    source.write_text("source")
+    consumer = RecordingRunnable("consume", execution_order, inputs=[intermediate], outputs=[tmp_path / "result.txt"])
+    producer = RecordingRunnable("produce", execution_order, inputs=[source], outputs=[intermediate])
+    assert executor.execute_all([consumer, producer], max_workers=4) == {"produce": 0, "consume": 0}
+    assert execution_order == ["produce", "consume"]
+    assert executor.previous_run_info_matches(consumer) == RunInfoStatus.MATCH
+
+
+def test_execute_all_runs_independent_runnables_concurrently(executor: Executor) -> None:
+    barrier = threading.Barrier(2, timeout=5)
+    runnables = [RecordingRunnable(name, [], barrier=barrier) for name in ("first", "second")]
+    assert executor.execute_all(runnables, max_workers=2) == {"first": 0, "second": 0}
+
+
+def test_execute_all_starts_longest_critical_path_first(tmp_path: Path) -> None:
+    execution_order: list[str] = []
+    intermediate = tmp_path / "intermediate.txt"
+    short = RecordingRunnable("short", execution_order)
+    unknown = RecordingRunnable("unknown", execution_order)
+    generate = RecordingRunnable("generate", execution_order, outputs=[intermediate])
+    long_test = RecordingRunnable("long_test", execution_order, inputs=[intermediate])
+    executor = Executor(cache_dir=tmp_path / "cache")
+    for runnable_id, duration in (("short", 2.0), ("generate", 1.0), ("long_test", 10.0)):
+        executor.run_durations.update(runnable_id, duration)
+    executor.flush()
+    # The durations are read from the cache directory. Unknown durations are assumed to be the average (13 / 3).
+    assert Executor(cache_dir=tmp_path / "cache").execute_all([short, unknown, generate, long_test], max_workers=1)
+    assert execution_order == ["generate", "long_test", "unknown", "short"]
+    assert executor.run_durations.get("unknown") is None
+    assert Executor(cache_dir=tmp_path / "cache").run_durations.get("unknown") is not None
+
+
+def test_run_durations_are_saved_when_closed(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    durations_file = tmp_path / "cache" / Executor.RUN_DURATIONS_FILE
+    read_files: list[Path] = []
+    original_read_text = Path.read_text
+
+    def recording_read_text(path: Path, *args: Any, **kwargs: Any) -> str:
+        read_files.append(path)
+        return original_read_text(path, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "read_text", recording_read_text)
+    with Executor(cache_dir=tmp_path / "cache") as executor:
+        for name in ("first", "second"):
+            executor.execute(RecordingRunnable(name, []))
+        assert not durations_file.exists()
+        assert durations_file not in read_files
+    assert json.loads(durations_file.read_text()).keys() == {"first", "second"}
+
+
+def test_execute_all_skips_dependents_of_failed_runnable(executor: Executor, tmp_path: Path) -> None:
+    execution_order: list[str] = []
+    intermediate = tmp_path / "intermediate.txt"
+    producer = RecordingRunnable("produce", execution_order, outputs=[intermediate], return_code=3)
+    consumer = RecordingRunnable("consume", execution_order, inputs=[intermediate])
+    independent = RecordingRunnable("independent", execution_order)
+    assert executor.execute_all([producer, consumer, independent]) == {"produce": 3, "independent": 0}
+    assert "consume" not in execution_order
+
+
+def test_hash_algorithm_changed(executor: Executor, tmp_path: Path) -> None:
+    input_path = tmp_path / "input.txt"
+    input_path.write_text("input")
+    runnable = MyRunnable(inputs=[input_path])
+    executor.execute(runnable)
+    assert json.loads(executor.get_runnable_run_info_file(runnable).read_text())["hash_algorithm"] == "sha256"
+    assert Executor(cache_dir=executor.cache_dir, hash_algorithm="blake2b").previous_run_info_matches(runnable) == RunInfoStatus.HASH_ALGORITHM_CHANGED
+
+
+def test_run_info_without_hash_algorithm_is_sha256(executor: Executor, tmp_path: Path) -> None:
+    input_path = tmp_path / "input.txt"
+    input_path.write_text("input")
+    runnable = MyRunnable(inputs=[input_path])
+    executor.execute(runnable)
+    run_info_path = executor.get_runnable_run_info_file(runnable)
+    run_info = json.loads(run_info_path.read_text())
+    del run_info["hash_algorithm"]
+    run_info_path.write_text(json.dumps(run_info))
+    assert executor.previous_run_info_matches(runnable) == RunInfoStatus.MATCH
+
+
+def test_unchanged_file_stat_skips_hashing(executor: Executor, tmp_path: Path, hashed_paths: list[Path]) -> None:
+    input_path = tmp_path / "input.txt"
+    input_path.write_text("input")
+    runnable = MyRunnable(inputs=[input_path])
+    executor.execute(runnable)
+    hashed_paths.clear()
+
+    assert executor.previous_run_info_matches(runnable) == RunInfoStatus.MATCH
+    assert hashed_paths == []
+
+    stat_result = input_path.stat()
+    os.utime(input_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+    assert executor.previous_run_info_matches(runnable) == RunInfoStatus.MATCH
+    assert hashed_paths == [input_path]
+
+
+def test_shared_inputs_are_hashed_once(tmp_path: Path, hashed_paths: list[Path]) -> None:
+    input_path = tmp_path / "shared.h"
+    input_path.write_text("shared")
+
+    with Executor(cache_dir=tmp_path / "cache", persist_hash_cache=True) as executor:
+        for runnable_id in ("first", "second"):
+            runnable = CustomIdRunnable(custom_id=runnable_id)
+            runnable._inputs = [input_path]
+            executor.execute(runnable)
+    assert hashed_paths == [input_path]
+
+    runnable = CustomIdRunnable(custom_id="third")
+    runnable._inputs = [input_path]
+    Executor(cache_dir=tmp_path / "cache", persist_hash_cache=True).execute(runnable)
+    assert hashed_paths == [input_path]
+
+
+def test_hash_cache_is_saved_once_when_closed(tmp_path: Path) -> None:
+    hash_cache_file = tmp_path / "cache" / Executor.HASH_CACHE_FILE
+    with Executor(cache_dir=tmp_path / "cache", persist_hash_cache=True) as executor:
+        for index in range(3):
+            input_path = tmp_path / f"input{index}.txt"
+            input_path.write_text(str(index))
+            executor.execute(MyRunnable(inputs=[input_path]))
+        assert not hash_cache_file.exists()
+    assert len(json.loads(hash_cache_file.read_text())["entries"]) == 3
+
+
+@pytest.mark.parametrize(("hash_directories", "expected_status"), [(False, RunInfoStatus.MATCH), (True, RunInfoStatus.FILE_CHANGED)])
+def test_directory_content_changed(tmp_path: Path, hash_directories: bool, expected_status: RunInfoStatus) -> None:
+    input_dir = tmp_path / "input_dir"
+    input_dir.mkdir()
+    (input_dir / "file.txt").write_text("content")
+    executor = Executor(cache_dir=tmp_path / "cache", hash_directories=hash_directories)
+    runnable = MyRunnable(inputs=[input_dir])
+    executor.execute(runnable)
+    (input_dir / "file.txt").write_text("changed content")
+    assert executor.previous_run_info_matches(runnable) == expected_status
+
+
+def test_directory_files_are_not_hashed_again_by_other_executor(tmp_path: Path, hashed_paths: list[Path]) -> None:
+    input_dir = tmp_path / "input_dir"
+    for index in range(50):
+        (input_dir / f"sub{index % 5}").mkdir(parents=True, exist_ok=True)
+        (input_dir / f"sub{index % 5}" / f"file{index}.txt").write_text(str(index))
+    runnable = MyRunnable(inputs=[input_dir])
+    with Executor(cache_dir=tmp_path / "cache", hash_directories=True) as executor:
+        executor.execute(runnable)
+    hashed_paths.clear()
+
+    assert Executor(cache_dir=tmp_path / "cache", hash_directories=True).previous_run_info_matches(runnable) == RunInfoStatus.MATCH
+    assert hashed_paths == []
+    (input_dir / "sub3" / "file3.txt").write_text("changed")
+    assert Executor(cache_dir=tmp_path / "cache", hash_directories=True).previous_run_info_matches(runnable) == RunInfoStatus.FILE_CHANGED
+    assert hashed_paths == [input_dir / "sub3" / "file3.txt"]
+
+
+def test_sqlite_run_info_backend(tmp_path: Path) -> None:
+    input_path = tmp_path / "input.txt"
+    input_path.write_text("input")
+    database_file = tmp_path / "cache" / SqliteRunInfoBackend.DEFAULT_DATABASE_FILE
+    runnable = MyRunnable(inputs=[input_path])
+    with Executor(cache_dir=tmp_path / "cache", run_info_backend=SqliteRunInfoBackend(database_file)) as executor:
+        executor.execute(runnable)
+    assert not executor.get_runnable_run_info_file(runnable).exists()
+    assert Executor(cache_dir=tmp_path / "cache", run_info_backend=SqliteRunInfoBackend(database_file)).previous_run_info_matches(runnable) == RunInfoStatus.MATCH
+
+
+def test_indexed_run_info(tmp_path: Path) -> None:
+    input_path = tmp_path / "input.txt"
+    input_path.write_text("input")
+    runnables = [MyRunnable(inputs=[input_path]), CustomIdRunnable("other")]
+    executor = Executor(cache_dir=tmp_path / "cache", index_run_info=True)
+    assert executor.execute_all(runnables) == {"MyRunnable": 0, "CustomIdRunnable_other": 0}
+    assert (tmp_path / "cache" / JsonIndexRunInfoBackend.DEFAULT_INDEX_FILE).is_file()
+    assert not list((tmp_path / "cache").glob(f"*{Executor.RUN_INFO_FILE_EXTENSION}"))
+    assert Executor(cache_dir=tmp_path / "cache", index_run_info=True).check_many(runnables) == {
+        "MyRunnable": RunInfoStatus.MATCH,
+        "CustomIdRunnable_other": RunInfoStatus.NOTHING_TO_CHECK,
+    }
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "index"])
+def test_closing_executor_persists_deferred_run_info(tmp_path: Path, backend: str) -> None:
+    input_path = tmp_path / "input.txt"
+    input_path.write_text("input")
+    runnable = MyRunnable(inputs=[input_path])
+
+    def create_executor() -> Executor:
+        if backend == "sqlite":
+            return Executor(cache_dir=tmp_path / "cache", run_info_backend=SqliteRunInfoBackend(tmp_path / "cache" / SqliteRunInfoBackend.DEFAULT_DATABASE_FILE))
+        return Executor(cache_dir=tmp_path / "cache", index_run_info=True)
+
+    with create_executor() as executor:
+        executor.execute(runnable)
+        # Executing a runnable does not write back the deferred run info
+        assert create_executor().previous_run_info_matches(runnable) == RunInfoStatus.NO_INFO
+    with create_executor() as executor:
+        assert executor.previous_run_info_matches(runnable) == RunInfoStatus.MATCH
+    if isinstance(executor.run_info_backend, SqliteRunInfoBackend):
+        assert executor.run_info_backend._connection is None
+
+
+class RaisingRunnable(RecordingRunnable):
+    def run(self) -> int:
+        raise RuntimeError("Unexpected failure")
+
+
+def test_execute_all_persists_run_info_when_a_runnable_raises(tmp_path: Path) -> None:
+    input_path, intermediate = tmp_path / "input.txt", tmp_path / "intermediate.txt"
+    input_path.write_text("input")
+    producer = RecordingRunnable("produce", [], inputs=[input_path], outputs=[intermediate])
+    consumer = RaisingRunnable("consume", [], inputs=[intermediate])
+    with pytest.raises(RuntimeError, match="Unexpected failure"):
+        Executor(cache_dir=tmp_path / "cache", index_run_info=True).execute_all([producer, consumer])
+    assert Executor(cache_dir=tmp_path / "cache", index_run_info=True).previous_run_info_matches(producer) == RunInfoStatus.MATCH
+
+
+def test_outputs_restored_from_artifact_cache(tmp_path: Path) -> None:
+    execution_order: list[str] = []
+    input_path, output_path = tmp_path / "input.txt", tmp_path / "output.txt"
+    input_path.write_text("input")
+    artifact_cache = ArtifactCache(tmp_path / "artifacts")
+    runnable = RecordingRunnable("generate", execution_order, inputs=[input_path], outputs=[output_path])
+    assert Executor(cache_dir=tmp_path / "workspace1", artifact_cache=artifact_cache).execute(runnable) == 0
+    output_path.unlink()
+
+    executor = Executor(cache_dir=tmp_path / "workspace2", artifact_cache=artifact_cache)
+    assert executor.execute(runnable) == 0
+    assert execution_order == ["generate"]
+    assert output_path.read_text() == "generate"
+    assert executor.previous_run_info_matches(runnable) == RunInfoStatus.MATCH
+
+
+def test_rerun_with_identical_outputs_reports_unchanged_outputs(executor: Executor, tmp_path: Path) -> None:
+    input_path, output_path = tmp_path / "input.txt", tmp_path / "output.txt"
+    input_path.write_text("input")
+    runnable = RecordingRunnable("generate", [], inputs=[input_path], outputs=[output_path])
+    assert executor.execute_runnable(runnable) == ExecutionResult(0, RunInfoStatus.NO_INFO, outputs_changed=True)
+    input_path.write_text("changed input")
+    assert executor.execute_runnable(runnable) == ExecutionResult(0, RunInfoStatus.FILE_CHANGED, outputs_changed=False)
+    assert executor.execute_runnable(runnable) == ExecutionResult(0, RunInfoStatus.MATCH, outputs_changed=False)
+
+
+def test_skipped_runnable_refreshes_stats_of_identical_files(executor: Executor, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    input_path = tmp_path / "generated.h"
+    input_path.write_text("generated")
+    runnable = MyRunnable(inputs=[input_path])
+    executor.execute(runnable)
+    input_path.unlink()
+    input_path.write_text("generated")
+    stat_result = input_path.stat()
+    os.utime(input_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+    assert executor.execute_runnable(runnable) == ExecutionResult(0, RunInfoStatus.MATCH, outputs_changed=False)
+
+    monkeypatch.setattr(Executor, "get_file_hash", staticmethod(lambda path, file_hasher=None: pytest.fail(f"{path} shall not be hashed")))
+    assert Executor(cache_dir=executor.cache_dir).previous_run_info_matches(runnable) == RunInfoStatus.MATCH
+
+
+def test_execution_metrics_stored_in_run_info(executor: Executor, tmp_path: Path) -> None:
+    input_path = tmp_path / "input.txt"
+    input_path.write_text("input")
+    runnable = MyRunnable(inputs=[input_path])
+    executor.execute(runnable)
+    metrics = json.loads(executor.get_runnable_run_info_file(runnable).read_text())["metrics"]
+    assert metrics["hashed_bytes"] == len("input")
+    assert {"check_time_s", "run_time_s", "hash_time_s"} <= metrics.keys()
+    assert [runnable_metrics.runnable_id for runnable_metrics in executor.metrics.metrics] == [runnable.get_id()]
+
+
+def test_check_many_hashes_shared_files_once(executor: Executor, tmp_path: Path, hashed_paths: list[Path]) -> None:
+    shared_input, changed_input = tmp_path / "shared.h", tmp_path / "changed.c"
+    shared_input.write_text("shared")
+    changed_input.write_text("source")
+    runnables = [CustomIdRunnable(custom_id=str(index)) for index in range(3)]
+    runnables[0]._inputs = [shared_input]
+    runnables[1]._inputs = [shared_input, changed_input]
+    for runnable in runnables[:2]:
+        executor.execute(runnable)
+    stat_result = shared_input.stat()
+    os.utime(shared_input, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+    changed_input.write_text("changed source")
+    hashed_paths.clear()
+
+    assert Executor(cache_dir=executor.cache_dir).check_many(runnables, max_workers=2) == {
+        "CustomIdRunnable_0": RunInfoStatus.MATCH,
+        "CustomIdRunnable_1": RunInfoStatus.FILE_CHANGED,
+        "CustomIdRunnable_2": RunInfoStatus.NO_INFO,
+    }
+    assert sorted(hashed_paths) == sorted([shared_input, changed_input])
+
+
+class HangingRunnable(MyRunnable):
+    def __init__(self, pid_file: Path, timeout_sec: float) -> None:
+        super().__init__(outputs=[pid_file])
+        self.timeout_sec = timeout_sec
+        self.pid_file = pid_file
+
+    def run(self) -> int:
+        child_process = subprocess.Popen(["sleep", "30"])  # noqa: S607
+        self.pid_file.write_text(str(child_process.pid))
+        time.sleep(30)
+        return 0
+
+
+def _process_exists(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # A terminated child which was not reaped yet is a zombie
+    return Path(f"/proc/{pid}/stat").exists() and Path(f"/proc/{pid}/stat").read_text().split()[2] != "Z"
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="Process tree inspection requires /proc")
+def test_timeout_terminates_process_tree(executor: Executor, tmp_path: Path) -> None:
+    pid_file = tmp_path / "child.pid"
+    runnable = HangingRunnable(pid_file, timeout_sec=1)
+    start_time = time.monotonic()
+    assert executor.execute(runnable) == Executor.TIMEOUT_EXIT_CODE
+    assert time.monotonic() - start_time < 20
+    # The killed child might need a moment to exit
+    child_pid = int(pid_file.read_text())
+    deadline = time.monotonic() + 5
+    while _process_exists(child_pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not _process_exists(child_pid)
+    assert executor.previous_run_info_matches(runnable) == RunInfoStatus.TIMED_OUT
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="Process tree inspection requires /proc")
+def test_interrupted_timeout_terminates_process_tree(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    pid_file = tmp_path / "child.pid"
+    runnable = HangingRunnable(pid_file, timeout_sec=30)
+    original_join = multiprocessing.Process.join
+
+    def interrupted_join(process: multiprocessing.Process, timeout: float | None = None) -> None:
+        if timeout == runnable.timeout_sec:
+            # Simulate Ctrl+C once the child process was started
+            while not pid_file.exists():
+                time.sleep(0.05)
+            raise KeyboardInterrupt
+        original_join(process, timeout)
+
+    monkeypatch.setattr(multiprocessing.Process, "join", interrupted_join)
+    assert runnable.timeout_sec is not None
+    with pytest.raises(KeyboardInterrupt):
+        run_with_timeout(runnable.run, runnable.timeout_sec)
+    child_pid = int(pid_file.read_text())
+    deadline = time.monotonic() + 5
+    while _process_exists(child_pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not _process_exists(child_pid)
+
+
+def test_runnable_with_timeout_returns_exit_code(executor: Executor) -> None:
+    runnable = MyRunnable(return_code=3)
+    runnable.timeout_sec = 30
+    assert executor.execute(runnable) == 3
+    assert executor.previous_run_info_matches(runnable) == RunInfoStatus.NOTHING_TO_CHECK
+
+
+class TimeoutRaisingRunnable(MyRunnable):
+    def run(self) -> int:
+        raise TimeoutError("Socket read timed out")
+
+
+def test_timeout_error_of_runnable_is_not_a_timeout(executor: Executor) -> None:
+    runnable = TimeoutRaisingRunnable(outputs=[])
+    with pytest.raises(TimeoutError, match="Socket read timed out"):
+        executor.execute(runnable)
+    assert executor.previous_run_info_matches(runnable) == RunInfoStatus.NO_INFO
+    # In a separate process, the exception is reported as a failure
+    runnable.timeout_sec = 30
+    assert executor.execute(runnable) == 1
+    assert executor.previous_run_info_matches(runnable) != RunInfoStatus.TIMED_OUT
+
+
+def test_watch_reexecutes_affected_runnables(executor: Executor, tmp_path: Path) -> None:
+    execution_order: list[str] = []
+    source, other_source, intermediate = tmp_path / "source.txt", tmp_path / "other.txt", tmp_path / "intermediate.txt"
+    source.write_text("source")
+    other_source.write_text("other")
+    producer = RecordingRunnable("produce", execution_order, inputs=[source], outputs=[intermediate])
+    consumer = RecordingRunnable("consume", execution_order, inputs=[intermediate], outputs=[tmp_path / "result.txt"])
+    independent = RecordingRunnable("independent", execution_order, inputs=[other_source])
+    stop_event = threading.Event()
+    executions: list[dict[str, int]] = []
+
+    def on_executed(exit_codes: dict[str, int]) -> None:
+        executions.append(exit_codes)
+        if len(executions) == 1:
+            source.write_text("changed source")
+        else:
+            stop_event.set()
+
+    executor.watch([producer, consumer, independent], stop_event, on_executed=on_executed, file_watcher_factory=lambda paths: PollingFileWatcher(paths, interval_sec=0.01))
+    assert executions == [{"produce": 0, "consume": 0, "independent": 0}, {"produce": 0, "consume": 0}]
+    # The intermediate file content did not change, so the consumer is checked but not run again
+    assert execution_order == ["produce", "independent", "consume", "produce"]
+
+
+class HeavyRunnable(RecordingRunnable):
+    def __init__(self, name: str, resources: dict[str, int], running: list[str], running_snapshots: list[list[str]]) -> None:
+        super().__init__(name, [])
+        self._resources = resources
+        self._running = running
+        self._running_snapshots = running_snapshots
+
+    def get_resources(self) -> dict[str, int]:
+        return self._resources
+
+    def run(self) -> int:
+        self._running.append(self._name)
+        time.sleep(0.05)
+        self._running_snapshots.append(list(self._running))
+        self._running.remove(self._name)
+        return 0
+
+
+def test_execute_all_respects_resource_limits(tmp_path: Path) -> None:
+    running: list[str] = []
+    running_snapshots: list[list[str]] = []
+    # The requirement of the last heavy runnable exceeds the limit, it is reduced to the limit
+    runnables: list[Runnable] = [HeavyRunnable(f"heavy{index}", {"mem_gb": 4 if index < 3 else 16}, running, running_snapshots) for index in range(4)]
+    runnables.append(HeavyRunnable("light", {"cpu": 1}, running, running_snapshots))
+    executor = Executor(cache_dir=tmp_path / "cache", resource_limits={"mem_gb": 8})
+    assert executor.execute_all(runnables, max_workers=3) == dict.fromkeys(["heavy0", "heavy1", "heavy2", "heavy3", "light"], 0)
+    assert max(sum(4 if name != "heavy3" else 8 for name in snapshot if name.startswith("heavy")) for snapshot in running_snapshots) == 8
+    # The light runnable fills the remaining worker while the heavy runnables wait for memory
+    assert ["heavy0", "heavy1", "light"] in [sorted(snapshot) for snapshot in running_snapshots]
+
+
+class CompileRunnable(MyRunnable):
+    def __init__(self, source: Path, headers: list[Path]) -> None:
+        self._object_file = source.with_suffix(".o")
+        super().__init__(inputs=[source], outputs=[self._object_file])
+        self._source = source
+        self._headers = headers
+        self.runs = 0
+
+    def get_depfile(self) -> Path | None:
+        return self._object_file.with_suffix(".d")
+
+    def run(self) -> int:
+        self.runs += 1
+        self._object_file.write_text("object")
+        dependencies = " \\\n  ".join(str(path) for path in [self._source, *self._headers])
+        self._object_file.with_suffix(".d").write_text(f"{self._object_file}: {dependencies}\n")
+        return 0
+
+
+def test_depfile_dependencies_are_tracked(executor: Executor, tmp_path: Path) -> None:
+    source, used_header, unused_header = tmp_path / "main.c", tmp_path / "used.h", tmp_path / "unused.h"
+    for path in (source, used_header, unused_header):
+        path.write_text(path.name)
+    runnable = CompileRunnable(source, [used_header])
+    executor.execute(runnable)
+    assert executor.run_info_backend.load(runnable.get_id())["discovered_inputs"] == {str(used_header): Executor.get_file_hash(used_header)}  # type: ignore[index]
+    unused_header.write_text("changed")
+    assert executor.previous_run_info_matches(runnable) == RunInfoStatus.MATCH
+    used_header.write_text("changed")
+    assert executor.previous_run_info_matches(runnable) == RunInfoStatus.FILE_CHANGED
+    assert executor.check_many([runnable]) == {runnable.get_id(): RunInfoStatus.FILE_CHANGED}
+    executor.execute(runnable)
+    assert runnable.runs == 2
+    assert executor.previous_run_info_matches(runnable) == RunInfoStatus.MATCH
+
+
+class GlobRunnable(RecordingRunnable):
+    def __init__(self, name: str, execution_order: list[str], input_globs: list[str], outputs: list[Path] | None = None) -> None:
+        super().__init__(name, execution_order, outputs=outputs)
+        self._input_globs = input_globs
+
+    def get_input_globs(self) -> list[str]:
+        return self._input_globs
+
+
+def test_input_globs(executor: Executor, tmp_path: Path) -> None:
+    execution_order: list[str] = []
+    source_dir = tmp_path / "src"
+    source_dir.mkdir()
+    (source_dir / "main.c").write_text("main")
+    generate = RecordingRunnable("generate", execution_order, outputs=[source_dir / "generated.c"])
+    compile_step = GlobRunnable("compile", execution_order, [str(source_dir / "**/*.c")])
+    assert RunnableGraph([compile_step, generate]).get_dependencies("compile") == {"generate"}
+    assert executor.execute_all([compile_step, generate]) == {"generate": 0, "compile": 0}
+    # The file generated in the same build is an input
+    assert set(executor.run_info_backend.load("compile")["inputs"]) == {str(source_dir / "main.c"), str(source_dir / "generated.c")}  # type: ignore[index]
+    assert executor.previous_run_info_matches(compile_step) == RunInfoStatus.MATCH
+    (source_dir / "README.md").write_text("not matching")
+    assert executor.previous_run_info_matches(compile_step) == RunInfoStatus.MATCH
+    (source_dir / "lib").mkdir()
+    (source_dir / "lib" / "new.c").write_text("new")
+    assert executor.previous_run_info_matches(compile_step) == RunInfoStatus.INPUT_FILES_CHANGED
+    assert RunnableGraph([compile_step]).get_affected([source_dir / "README.md"]) == []
+    assert RunnableGraph([compile_step]).get_affected([source_dir / "lib" / "new.c"]) == ["compile"]
+
+
+class CpuBoundRunnable(MyRunnable):
+    def __init__(self, name: str, output: Path) -> None:
+        super().__init__(outputs=[output], return_code=5)
+        self.cpu_bound = True
+        self._name = name
+
+    def get_name(self) -> str:
+        return self._name
+
+    def run(self) -> int:
+        logger.warning(f"Running {self._name}")
+        self._outputs[0].write_text(str(os.getpid()))
+        return super().run()
+
+
+def test_cpu_bound_runnables_run_in_process_pool(tmp_path: Path) -> None:
+    messages: list[str] = []
+    handler_id = logger.add(lambda message: messages.append(f"{message.record['function']}: {message.record['message']}"), level="WARNING")
+    runnables: list[Runnable] = [CpuBoundRunnable(f"parse{index}", tmp_path / f"parse{index}.txt") for index in range(2)]
+    try:
+        with Executor(cache_dir=tmp_path / "cache", process_pool_workers=2) as executor:
+            assert executor.execute_all(runnables) == {"parse0": 5, "parse1": 5}
+    finally:
+        logger.remove(handler_id)
+    assert {int((tmp_path / f"parse{index}.txt").read_text()) for index in range(2)}.isdisjoint({os.getpid()})
+    assert {"run: Running parse0", "run: Running parse1"} <= set(messages)
+    # The run info is stored by the parent process
+    assert executor.previous_run_info_matches(runnables[0]) == RunInfoStatus.MATCH